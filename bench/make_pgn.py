@@ -0,0 +1,126 @@
+"""Generates a synthetic PGN file for benchmarking selector.py.
+
+Games are random legal move sequences between a handful of made-up engines.
+A given fraction of them is flagged: its last move carries one of the
+termination comments selector.py recognizes, with a matching result. The
+output only depends on the arguments, so the same corpus can be regenerated
+anywhere.
+"""
+
+import argparse
+import random
+
+import chess
+
+ENGINES = ['Alpha 1.0', 'Beta 2.3', 'Gamma 0.9', 'Delta 5', 'Epsilon 12']
+
+# Termination comments as written by common GUIs, for the side that lost.
+# Each is (comment, result) where the comment may use {loser} and {winner}.
+FLAGGED_ENDINGS = [
+    ('{winner} wins on time', 'loss'),
+    ('{loser} forfeits on time', 'loss'),
+    ('Arena Adjudication. Illegal move!', 'loss'),
+    ('polyglot: resign (illegal engine move by {loser})', 'loss'),
+    ('Forfeit due to invalid move', 'loss'),
+    ('False illegal-move claim', 'loss'),
+    ('{loser} exited unexpectedly', 'loss'),
+    ('False draw claim: {loser}', 'loss'),
+    ('{winner} has mating material but bare king', 'draw'),
+]
+
+NORMAL_ENDINGS = [
+    ('{winner} mates', 'loss'),
+    ('{loser} resigns', 'loss'),
+    ('Draw by 3-fold repetition', 'draw'),
+    ('Draw by adjudication', 'draw'),
+]
+
+
+def random_moves(rng, max_plies):
+    """Returns the SAN moves of a random legal game of at most max_plies plies."""
+    board = chess.Board()
+    moves = []
+    for _ in range(rng.randint(10, max_plies)):
+        legal = list(board.legal_moves)
+        if not legal:
+            break
+        move = rng.choice(legal)
+        moves.append(board.san(move))
+        board.push(move)
+    return moves
+
+
+def format_game(rng, num, moves, ending):
+    """Returns the PGN text of one game ending with the comment of ending."""
+    white, black = rng.sample(ENGINES, 2)
+    comment, kind = ending
+    if kind == 'draw':
+        result = '1/2-1/2'
+        winner, loser = rng.choice([('White', 'Black'), ('Black', 'White')])
+    else:
+        result = rng.choice(['1-0', '0-1'])
+        winner, loser = ('White', 'Black') if result == '1-0' else ('Black', 'White')
+
+    tokens = []
+    for ply, san in enumerate(moves):
+        if ply % 2 == 0:
+            tokens.append(f'{ply // 2 + 1}.')
+        tokens.append(san)
+        if ply < len(moves) - 1:
+            tokens.append(f'{{{rng.uniform(-2, 2):+.2f}/{rng.randint(8, 30)} 0.1s}}')
+    tokens.append('{' + comment.format(winner=winner, loser=loser) + '}')
+    tokens.append(result)
+
+    lines, line = [], ''
+    for token in tokens:
+        if line and len(line) + len(token) + 1 > 79:
+            lines.append(line)
+            line = token
+        else:
+            line = f'{line} {token}' if line else token
+    lines.append(line)
+
+    headers = [
+        ('Event', 'Synthetic gauntlet'), ('Site', 'bench'), ('Date', '2024.01.01'),
+        ('Round', str(num)), ('White', white), ('Black', black), ('Result', result),
+    ]
+    header_text = ''.join(f'[{name} "{value}"]\n' for name, value in headers)
+    return f'{header_text}\n' + '\n'.join(lines) + '\n\n'
+
+
+def write_corpus(path, games, flagged_ratio, seed=1, distinct=500, max_plies=120):
+    """Writes games synthetic games to path and returns the number flagged.
+
+    Only `distinct` move sequences are generated and then reused with other
+    players, results and comments, which keeps large corpora quick to make.
+    """
+    rng = random.Random(seed)
+    sequences = [random_moves(rng, max_plies) for _ in range(min(distinct, games))]
+    flagged = 0
+    with open(path, 'w', newline='\n') as f:
+        for num in range(1, games + 1):
+            if rng.random() < flagged_ratio:
+                ending = rng.choice(FLAGGED_ENDINGS)
+                flagged += 1
+            else:
+                ending = rng.choice(NORMAL_ENDINGS)
+            f.write(format_game(rng, num, rng.choice(sequences), ending))
+    return flagged
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Generate a synthetic PGN corpus')
+    parser.add_argument('output', help='PGN file to write.')
+    parser.add_argument('--games', type=int, default=10000,
+                        help='number of games (default=10000).')
+    parser.add_argument('--flagged-ratio', type=float, default=0.1,
+                        help='fraction of games with a termination comment (default=0.1).')
+    parser.add_argument('--seed', type=int, default=1, help='random seed (default=1).')
+    args = parser.parse_args()
+
+    flagged = write_corpus(args.output, args.games, args.flagged_ratio, args.seed)
+    print(f'wrote {args.games} games, {flagged} flagged, to {args.output}')
+
+
+if __name__ == '__main__':
+    main()
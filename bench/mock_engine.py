@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""A stub UCI engine for benchmarking selector.py without a real engine.
+
+Evaluations are deterministic: the score of a position is derived from a
+CRC32 of its FEN, so repeated runs give the same verdicts. Every search
+reports MOCK_ENGINE_DEPTHS depths spread over MOCK_ENGINE_LATENCY seconds
+and then plays the first legal move in UCI order.
+"""
+
+import os
+import sys
+import time
+import zlib
+
+import chess
+
+LATENCY = float(os.environ.get('MOCK_ENGINE_LATENCY', '0.01'))
+DEPTHS = int(os.environ.get('MOCK_ENGINE_DEPTHS', '5'))
+
+
+def send(line):
+    sys.stdout.write(line + '\n')
+    sys.stdout.flush()
+
+
+def parse_position(parts):
+    if parts[1] == 'startpos':
+        board = chess.Board()
+        rest = parts[2:]
+    else:
+        board = chess.Board(' '.join(parts[2:8]))
+        rest = parts[8:]
+    if rest and rest[0] == 'moves':
+        for move in rest[1:]:
+            board.push_uci(move)
+    return board
+
+
+def search(board):
+    score = zlib.crc32(board.fen().encode()) % 2001 - 1000
+    moves = sorted(move.uci() for move in board.legal_moves)
+    pv = f' pv {moves[0]}' if moves else ''
+    for depth in range(1, DEPTHS + 1):
+        time.sleep(LATENCY / DEPTHS)
+        send(f'info depth {depth} score cp {score} nodes {depth * 1000} nps 100000{pv}')
+    send(f'bestmove {moves[0] if moves else "(none)"}')
+
+
+def main():
+    board = chess.Board()
+    for line in sys.stdin:
+        parts = line.split()
+        if not parts:
+            continue
+        if parts[0] == 'uci':
+            send('id name MockEngine')
+            send('id author gameselector bench')
+            send('option name Hash type spin default 16 min 1 max 33554432')
+            send('option name Threads type spin default 1 min 1 max 1024')
+            send('uciok')
+        elif parts[0] == 'isready':
+            send('readyok')
+        elif parts[0] == 'position':
+            board = parse_position(parts)
+        elif parts[0] == 'go':
+            search(board)
+        elif parts[0] == 'quit':
+            break
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,161 @@
+"""Benchmarks selector.py on a synthetic corpus with the stub engine.
+
+Every mode runs selector.py in a fresh process in its own scratch folder,
+with --stats. The table shows games/sec, engine calls, cache hits, the
+seconds spent per stage and the peak RSS of the run. Peak RSS is that of
+the largest selector process, shard processes included but not engines.
+It needs os.wait4 and is not measured on Windows.
+
+    python bench/run_bench.py --games 20000 --flagged-ratio 0.1 --latency 0.005
+"""
+
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+from make_pgn import write_corpus
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+SELECTOR = os.path.join(os.path.dirname(BENCH_DIR), 'selector.py')
+
+# Mode name and the selector.py arguments it adds. cache-warm reuses the
+# cache filled by cache-cold, so it must come after it.
+MODES = {
+    'serial': [],
+    'workers4': ['--workers', '4'],
+    'async4': ['--workers', '4', '--async-engines'],
+    'shards2': ['--workers', '2', '--shards', '2'],
+    'adaptive': ['--workers', '4', '--adaptive'],
+    'cache-cold': ['--workers', '4', '--cache', '{cache}'],
+    'cache-warm': ['--workers', '4', '--cache', '{cache}'],
+}
+
+STAGES = ['scan', 'parse', 'board', 'cache', 'submit', 'engine_wait', 'write']
+
+
+def engine_command(folder):
+    """Writes a launcher for the stub engine, which must be an executable file."""
+    script = os.path.join(BENCH_DIR, 'mock_engine.py')
+    if os.name == 'nt':
+        path = os.path.join(folder, 'mock_engine.bat')
+        with open(path, 'w') as f:
+            f.write(f'@"{sys.executable}" "{script}"\n')
+    else:
+        path = os.path.join(folder, 'mock_engine.sh')
+        with open(path, 'w') as f:
+            f.write(f'#!/bin/sh\nexec "{sys.executable}" "{script}"\n')
+        os.chmod(path, 0o755)
+    return path
+
+
+def run_selector(args, cwd, env):
+    """Runs selector.py and returns its wall time in seconds and peak RSS in MB."""
+    start = time.monotonic()
+    process = subprocess.Popen([sys.executable, SELECTOR] + args, cwd=cwd, env=env,
+                               stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+    if hasattr(os, 'wait4'):
+        _, status, usage = os.wait4(process.pid, 0)
+        returncode = os.waitstatus_to_exitcode(status)
+        # ru_maxrss is in bytes on macOS and in kilobytes elsewhere.
+        peak_rss = usage.ru_maxrss / (1024 * 1024 if sys.platform == 'darwin' else 1024)
+        process.returncode = returncode
+        stderr = process.stderr.read().decode(errors='replace')
+    else:
+        stderr = process.communicate()[1].decode(errors='replace')
+        returncode = process.returncode
+        peak_rss = None
+    if returncode != 0:
+        raise RuntimeError(f'selector.py failed with exit code {returncode}:\n{stderr}')
+    return time.monotonic() - start, peak_rss
+
+
+def run_mode(name, corpus, engine, folder, move_time):
+    """Runs one mode and returns its row of results."""
+    cwd = os.path.join(folder, name)
+    os.makedirs(cwd)
+    stats_path = os.path.join(cwd, 'stats.json')
+    extra = [arg.format(cache=os.path.join(folder, 'cache.sqlite')) for arg in MODES[name]]
+    args = ['--input', corpus, '--output-good', os.path.join('output', 'good.pgn'),
+            '--output-bad', os.path.join('output', 'bad.pgn'), '--engine', engine,
+            '--move-time-sec', str(move_time), '--stats', stats_path] + extra
+    elapsed, peak_rss = run_selector(args, cwd, os.environ)
+    with open(stats_path) as f:
+        stats = json.load(f)
+    return {
+        'mode': name, 'elapsed_sec': round(elapsed, 3),
+        'games_per_sec': round(stats['games'] / elapsed, 1) if elapsed else None,
+        'engine_calls': stats['engine_calls'], 'cache_hits': stats['cache_hits'],
+        'peak_rss_mb': round(peak_rss, 1) if peak_rss is not None else None,
+        'stages': stats['stage_sec'],
+    }
+
+
+def print_table(rows):
+    columns = ['mode', 'elapsed_sec', 'games_per_sec', 'engine_calls', 'cache_hits',
+               'peak_rss_mb'] + STAGES
+    table = [[str(row.get(column, row['stages'].get(column, ''))) for column in columns]
+             for row in rows]
+    widths = [max(len(column), *(len(line[i]) for line in table))
+              for i, column in enumerate(columns)]
+    print('  '.join(column.rjust(width) for column, width in zip(columns, widths)))
+    for line in table:
+        print('  '.join(value.rjust(width) for value, width in zip(line, widths)))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark selector.py')
+    parser.add_argument('--games', type=int, default=5000,
+                        help='number of games in the corpus (default=5000).')
+    parser.add_argument('--flagged-ratio', type=float, default=0.1,
+                        help='fraction of flagged games (default=0.1).')
+    parser.add_argument('--input', help='benchmark this PGN instead of a synthetic corpus.')
+    parser.add_argument('--latency', type=float, default=0.01,
+                        help='seconds the stub engine spends per position (default=0.01).')
+    parser.add_argument('--move-time-sec', type=float, default=1,
+                        help='--move-time-sec passed to selector.py (default=1).')
+    parser.add_argument('--modes', default=','.join(MODES),
+                        help=f'comma separated modes to run (default={",".join(MODES)}).')
+    parser.add_argument('--json', help='also write the results to this JSON file.')
+    parser.add_argument('--keep', action='store_true', help='keep the scratch folder.')
+    args = parser.parse_args()
+
+    modes = args.modes.split(',')
+    unknown = [mode for mode in modes if mode not in MODES]
+    if unknown:
+        parser.error(f'unknown modes: {", ".join(unknown)}')
+
+    folder = tempfile.mkdtemp(prefix='selector-bench-')
+    os.environ['MOCK_ENGINE_LATENCY'] = str(args.latency)
+    try:
+        corpus = args.input and os.path.abspath(args.input)
+        if corpus is None:
+            corpus = os.path.join(folder, 'corpus.pgn')
+            flagged = write_corpus(corpus, args.games, args.flagged_ratio)
+            print(f'corpus: {args.games} games, {flagged} flagged, '
+                  f'{os.path.getsize(corpus) / 1e6:.1f} MB')
+        engine = engine_command(folder)
+
+        rows = []
+        for mode in modes:
+            rows.append(run_mode(mode, corpus, engine, folder, args.move_time_sec))
+            print(f'{mode}: {rows[-1]["games_per_sec"]} games/sec')
+        print()
+        print_table(rows)
+
+        if args.json:
+            with open(args.json, 'w') as f:
+                json.dump({'settings': vars(args), 'results': rows}, f, indent=2)
+    finally:
+        if args.keep:
+            print(f'\nscratch folder: {folder}')
+        else:
+            shutil.rmtree(folder)
+
+
+if __name__ == '__main__':
+    main()
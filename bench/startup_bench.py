@@ -0,0 +1,139 @@
+"""Measures how long selector.py takes to start.
+
+Each case is run --repeat times in a fresh process and the fastest wall time
+is shown, which leaves out most of the noise of a busy machine. The cases
+are --version as a script and with python -m, which can use the compiled
+bytecode, and a small run without and with flagged games, using the stub
+engine. The slowest imports, from python -X importtime, of selector itself
+and of the small run without flagged games, which should add none, are
+listed after the table.
+
+    python bench/startup_bench.py --repeat 20
+"""
+
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+from make_pgn import write_corpus
+from run_bench import SELECTOR, engine_command
+
+SELECTOR_DIR = os.path.dirname(SELECTOR)
+
+
+def cases(folder, engine):
+    """Returns the case names and their command lines."""
+    outputs = ['--output-good', os.path.join('output', 'good.pgn'),
+               '--output-bad', os.path.join('output', 'bad.pgn'), '--engine', engine]
+    return {
+        'version-script': [sys.executable, SELECTOR, '--version'],
+        'version-module': [sys.executable, '-m', 'selector', '--version'],
+        'small-clean': [sys.executable, '-m', 'selector', '--input',
+                        os.path.join(folder, 'clean.pgn')] + outputs,
+        'small-flagged': [sys.executable, '-m', 'selector', '--input',
+                          os.path.join(folder, 'flagged.pgn')] + outputs,
+    }
+
+
+def time_command(command, cwd, env, repeat):
+    """Returns the fastest of repeat wall times of command, in milliseconds."""
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.run(command, cwd=cwd, env=env, check=True,
+                       stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        times.append(time.perf_counter() - start)
+    return round(min(times) * 1000, 1)
+
+
+def slowest_imports(env, count, arguments=None, cwd=SELECTOR_DIR):
+    """Returns the count slowest modules imported by selector, in milliseconds.
+
+    With arguments, selector is also run with them, and the modules it imports
+    while running are included.
+    """
+    code = 'import selector' if arguments is None else 'import selector; selector.main()'
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', code] + (arguments or []),
+                            cwd=cwd, env=env, check=True,
+                            stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
+    # Lines are "import time: self [us] | cumulative | name", indented two spaces
+    # per level, and a module is listed after everything it imports. The ones
+    # imported at the top level after selector are imported while it runs.
+    imports = []
+    imported = False
+    for line in result.stderr.splitlines():
+        parts = line.partition('import time:')[2].split('|')
+        if len(parts) != 3 or not parts[1].strip().isdigit():
+            continue
+        name = parts[2].rstrip()
+        depth = (len(name) - len(name.lstrip())) // 2
+        if imported:
+            if depth == 0:
+                imports.append((name.strip(), int(parts[1]) / 1000))
+        elif depth == 0:
+            if name.strip() == 'selector':
+                imported = True
+            else:
+                imports = []
+        elif depth == 1:
+            imports.append((name.strip(), int(parts[1]) / 1000))
+    return sorted(imports, key=lambda item: -item[1])[:count]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the startup of selector.py')
+    parser.add_argument('--repeat', type=int, default=10,
+                        help='runs per case, the fastest is reported (default=10).')
+    parser.add_argument('--games', type=int, default=20,
+                        help='number of games in the small inputs (default=20).')
+    parser.add_argument('--imports', type=int, default=10,
+                        help='number of slowest imports to list (default=10).')
+    parser.add_argument('--json', help='also write the results to this JSON file.')
+    args = parser.parse_args()
+
+    folder = tempfile.mkdtemp(prefix='selector-startup-')
+    # python -m selector must find selector.py, and latency is kept low so that startup dominates.
+    env = dict(os.environ, PYTHONPATH=SELECTOR_DIR, MOCK_ENGINE_LATENCY='0.001')
+    try:
+        write_corpus(os.path.join(folder, 'clean.pgn'), args.games, 0)
+        write_corpus(os.path.join(folder, 'flagged.pgn'), args.games, 0.2)
+        engine = engine_command(folder)
+        # The first run writes the bytecode and brings the files into the page cache.
+        for command in cases(folder, engine).values():
+            subprocess.run(command, cwd=folder, env=env, stdout=subprocess.DEVNULL,
+                           stderr=subprocess.DEVNULL)
+
+        rows = []
+        for name, command in cases(folder, engine).items():
+            rows.append({'case': name, 'ms': time_command(command, folder, env, args.repeat)})
+            print(f'{name:>16}  {rows[-1]["ms"]:8.1f} ms')
+
+        imports = slowest_imports(env, args.imports)
+        print('\nslowest imports of selector:')
+        for name, ms in imports:
+            print(f'{name:>16}  {ms:8.1f} ms')
+        # The case runs python -m selector, the profile calls main() after importing it.
+        run_imports = slowest_imports(env, args.imports, cases(folder, engine)['small-clean'][3:],
+                                      folder)
+        print('\nslowest imports of small-clean:')
+        for name, ms in run_imports:
+            print(f'{name:>16}  {ms:8.1f} ms')
+
+        if args.json:
+            with open(args.json, 'w') as f:
+                json.dump({'settings': vars(args), 'results': rows,
+                           'imports': [{'module': name, 'ms': ms} for name, ms in imports],
+                           'run_imports': [{'module': name, 'ms': ms}
+                                           for name, ms in run_imports]},
+                          f, indent=2)
+    finally:
+        shutil.rmtree(folder)
+
+
+if __name__ == '__main__':
+    main()
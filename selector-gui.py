@@ -1,17 +1,10 @@
 import tkinter as tk
 from tkinter import filedialog, messagebox, ttk
-import subprocess
 import os
-import time
-import multiprocessing
-import signal
-import psutil
-from PIL import Image, ImageTk
-import pkg_resources
-import requests
-import base64
-import sys
+import queue
+import threading
 import json
+import selector
 
 class GameSelectorApp:
     def __init__(self, master):
@@ -26,6 +19,9 @@ class GameSelectorApp:
         self.input_button = tk.Button(master, text="Browse", command=self.load_input_file, bg='lightgreen')
         self.input_button.pack()
 
+        self.input_folder_button = tk.Button(master, text="Browse Folder", command=self.load_input_folder, bg='lightgreen')
+        self.input_folder_button.pack()
+
         self.engine_label = tk.Label(master, text="Load Engine:", bg='darkgrey', fg='black')
         self.engine_label.pack()
 
@@ -77,6 +73,9 @@ class GameSelectorApp:
         self.run_button = tk.Button(master, text="Run", command=self.run_game_selector, bg='lightgreen')
         self.run_button.pack()
 
+        self.cancel_button = tk.Button(master, text="Cancel", command=self.cancel_game_selector, bg='orange', state=tk.DISABLED)
+        self.cancel_button.pack()
+
         self.quit_button = tk.Button(master, text="Quit", command=self.quit_application, bg='red', fg='white')
         self.quit_button.pack()
 
@@ -86,6 +85,14 @@ class GameSelectorApp:
         self.progress = ttk.Progressbar(master, orient="horizontal", length=300, mode="determinate")
         self.progress.pack(pady=10)
 
+        self.status_label = tk.Label(master, text="", bg='darkgrey', fg='black', justify="left")
+        self.status_label.pack()
+
+        self.worker = None
+        self.cancel_event = None
+        self.progress_queue = queue.Queue()
+        self.quitting = False
+
         self.input_file = None
         self.output_dir = "output"
         os.makedirs(self.output_dir, exist_ok=True)
@@ -110,24 +117,28 @@ class GameSelectorApp:
             self.engine_label.config(text=os.path.basename(self.engine_file))
 
     def load_input_file(self):
-        self.clear_output_folder()
-        self.input_file = filedialog.askopenfilename(filetypes=[("PGN files", "*.pgn")])
-        self.label.config(text=os.path.basename(self.input_file))
+        # Several files are processed as a batch, one output folder each.
+        files = filedialog.askopenfilenames(filetypes=[("PGN files", "*.pgn")])
+        if not files:
+            return
+        self.input_file = os.pathsep.join(files)
+        self.label.config(text=os.path.basename(files[0]) if len(files) == 1 else f"{len(files)} PGN files")
 
-    def clear_output_folder(self):
-        for filename in os.listdir(self.output_dir):
-            file_path = os.path.join(self.output_dir, filename)
-            try:
-                if os.path.isfile(file_path):
-                    os.remove(file_path)
-            except Exception as e:
-                print(f"Error deleting file {file_path}: {e}")
+    def load_input_folder(self):
+        folder = filedialog.askdirectory()
+        if not folder:
+            return
+        self.input_file = folder
+        self.label.config(text=f"{os.path.basename(folder)} folder")
 
     def load_engine_file(self):
         self.engine_file = filedialog.askopenfilename(filetypes=[("Engine files", "*.exe;*.bin")])
         self.engine_label.config(text=os.path.basename(self.engine_file))
 
     def download_stockfish(self):
+        # requests is slow to import and only needed here.
+        import requests
+
         url = "https://chess.ultimaiq.net/stockfish_x64.exe"
         local_filename = "stockfish_x64.exe"
         
@@ -147,6 +158,8 @@ class GameSelectorApp:
         messagebox.showinfo("Info", "Stockfish downloaded and installed successfully.")
 
     def run_game_selector(self):
+        if self.worker is not None:
+            return
         if not all([self.input_file, self.engine_file]):
             messagebox.showerror("Error", "Please select all files.")
             return
@@ -156,8 +169,7 @@ class GameSelectorApp:
         score_margin_value = self.margin_entry.get()
         move_time_value = self.move_time_entry.get()
 
-        command = [
-            'python.exe','selector.py',        
+        argv = [
             '--input', self.input_file,
             '--output-good', self.output_good_file,
             '--output-bad', self.output_bad_file,
@@ -167,24 +179,88 @@ class GameSelectorApp:
             '--score-margin', score_margin_value,
             '--move-time-sec', move_time_value
         ]
-
-        if not os.path.exists('selector.py'):
-            messagebox.showerror("Error", "selector.py not found in directory.")
+        try:
+            args = selector.parse_args(argv)
+        except SystemExit:
+            messagebox.showerror("Error", "Please check the hash, threads, score margin and move time values.")
             return
 
-        self.progress.start()
-        self.master.update()
-
-        total_steps = 100
-        for step in range(total_steps):
-            time.sleep(0.1)
-            self.progress['value'] = step + 1
-            self.master.update()
-
-        subprocess.Popen(['start', 'cmd', '/k'] + command, shell=True)
-
-        self.progress.stop()
-        messagebox.showinfo("Info", "Processing started in terminal.")
+        # The selection runs in a worker thread; Tk is only updated from poll_progress.
+        self.cancel_event = threading.Event()
+        self.worker = threading.Thread(target=self.selector_worker, args=(args,), daemon=True)
+        self.progress['maximum'] = 100
+        self.progress['value'] = 0
+        self.status_label.config(text="Starting engines...")
+        self.run_button.config(state=tk.DISABLED)
+        self.cancel_button.config(state=tk.NORMAL)
+        self.worker.start()
+        self.master.after(200, self.poll_progress)
+
+    def selector_worker(self, args):
+        try:
+            run = selector.run_batch if args.batch else selector.run
+            summary = run(args, progress=lambda state: self.progress_queue.put(('progress', state)),
+                          cancel=self.cancel_event)
+            self.progress_queue.put(('done', summary))
+        except Exception as e:
+            self.progress_queue.put(('error', e))
+
+    def poll_progress(self):
+        while True:
+            try:
+                kind, value = self.progress_queue.get_nowait()
+            except queue.Empty:
+                break
+            if kind == 'progress':
+                self.show_progress(value)
+            else:
+                self.selector_finished(kind, value)
+                return
+        self.master.after(200, self.poll_progress)
+
+    def show_progress(self, state):
+        done, total, elapsed = state['bytes_done'], state['bytes_total'], state['elapsed']
+        self.progress['value'] = 100 * done / total if total else 100
+        rate = state['games'] / elapsed if elapsed else 0
+        if done and total > done:
+            seconds = int(elapsed * (total - done) / done)
+            eta = f"{seconds // 3600}:{seconds // 60 % 60:02d}:{seconds % 60:02d}"
+        else:
+            eta = "-"
+        # The number of games is only known when the pgn was indexed before.
+        games_total = f" of {state['games_total']}" if state['games_total'] is not None else ""
+        current_file = ""
+        if 'files' in state:
+            current_file = f"file {state['file_num']} of {state['files']}: {os.path.basename(state['file'])}\n"
+        self.status_label.config(text=(
+            current_file +
+            f"{state['games']}{games_total} games, {rate:.1f} games/sec, ETA {eta}\n"
+            f"flagged: {state['flagged']}, bad: {state['bad']}\n"
+            f"engine calls: {state['engine_calls']}, cache hits: {state['cache_hits']}"))
+
+    def selector_finished(self, kind, value):
+        self.worker.join()
+        self.worker = None
+        self.run_button.config(state=tk.NORMAL)
+        self.cancel_button.config(state=tk.DISABLED)
+        if self.quitting:
+            self.master.quit()
+            return
+        if kind == 'error':
+            self.status_label.config(text="")
+            messagebox.showerror("Error", f"Game selection failed: {value}")
+        elif value['cancelled']:
+            messagebox.showinfo("Info", f"Cancelled after {value['games']} games, {value['bad']} bad.")
+        else:
+            self.progress['value'] = 100
+            messagebox.showinfo("Info", f"Finished: {value['games']} games, {value['bad']} bad.\n"
+                                        f"The results are in the {self.output_dir} folder.")
+
+    def cancel_game_selector(self):
+        if self.worker is not None:
+            self.cancel_event.set()
+            self.cancel_button.config(state=tk.DISABLED)
+            self.status_label.config(text="Cancelling, waiting for the engines to finish...")
 
     def show_info(self):
         info_window = tk.Toplevel(self.master)
@@ -217,10 +293,12 @@ class GameSelectorApp:
         text_label.pack(expand=True, fill='both')
 
     def quit_application(self):
-        for proc in psutil.process_iter():
-            if proc.name() == "python.exe" or proc.name() == "python":
-                proc.send_signal(signal.SIGTERM)
-        self.master.quit()
+        # A running selection is cancelled first, so that its engines are shut down.
+        if self.worker is not None:
+            self.quitting = True
+            self.cancel_game_selector()
+        else:
+            self.master.quit()
 
     def on_closing(self):
         self.master.attributes('-topmost', 1)
@@ -1,32 +1,98 @@
 import os
 import argparse
-import chess.pgn
-import chess.engine
+import array
+import bisect
+import copy
+import csv
+import glob
+import hashlib
+import io
+import itertools
+import json
+import mmap
+import re
 import sys
 import time
-import colorama
-import subprocess
-from collections import defaultdict
+from contextlib import contextmanager
+import functools
+import queue
+import threading
+import shutil
+import struct
+from collections import Counter, defaultdict, deque, namedtuple
 
-colorama.init(autoreset=True)
-
-os.system('cls' if os.name == 'nt' else 'clear')
+# python-chess, colorama, asyncio, sqlite3 and the other slower modules are
+# imported where they are used, so that --version, argument errors and runs
+# that do not need them start quickly.
 
 __script_name__ = '    game-selector 2'
 __goal__ = 'Separate good and bad games'
 __version__ = '0.2.7_JA'
 
 
+TERMINATION_KEYWORDS = [
+    'but bare king} 1/2-1/2',
+    'forfeits on time',
+    'Arena Adjudication. Illegal move!',
+    'polyglot: resign (illegal engine move',
+    'Forfeit due to invalid move',
+    'wins on time',
+    'False illegal-move claim',
+    'exited unexpectedly',
+    'False draw claim:',
+]
+
+# All keywords in one pattern; the closing brace may be preceded by whitespace.
+TERMINATION_RE = re.compile('|'.join(
+    r'\s*\}\s+'.join(re.escape(part) for part in keyword.split('} '))
+    for keyword in TERMINATION_KEYWORDS).encode())
+
+# The end of a line that is no tag pair, any blank lines, then the first tag pair
+# of the next header section. Wrapped comment lines like "[%clk 0:01:00] }"
+# are no tag pairs, so they neither start nor end a header section.
+TAG_PAIR = rb'\[[A-Za-z0-9_]+[ \t]+"'
+GAME_START_RE = re.compile(rb'^(?![ \t]*' + TAG_PAIR + rb')[ \t]*\S[^\n]*\n(?:[ \t\r]*\n)*(?='
+                           + TAG_PAIR + rb')', re.M)
+NON_SPACE_RE = re.compile(rb'\S')
+HEADER_END_RE = re.compile(rb'\n[ \t\r]*\n')
+RESULT_TAG_RE = re.compile(rb'^\[Result "([^"]*)"\]', re.M)
+
+# Reason codes of bad games, with the keywords that identify them.
+BAD_GAME_REASONS = [
+    ('time', ['wins on time', 'forfeits on time']),
+    ('illegal_move', ['Arena Adjudication. Illegal move!',
+                      'polyglot: resign (illegal engine move',
+                      'Forfeit due to invalid move']),
+    ('crash', ['exited unexpectedly']),
+    ('bare_king', ['but bare king} 1/2-1/2']),
+    ('false_illegal_claim', ['False illegal-move claim']),
+    ('false_draw_claim', ['False draw claim:']),
+]
+
+# The reason reported for a bad game is the first of these that was found.
+REPORT_ORDER = [
+    ('time', 'game lost on time'),
+    ('crash', 'game lost by crash'),
+    ('illegal_move', 'game lost by illegal move'),
+    ('bare_king', 'game drawn in winning position'),
+    ('false_illegal_claim', 'false illegal move claim'),
+    ('false_draw_claim', 'false draw claim'),
+]
+
+# Columns of the bad game records, one row per bad game.
+RECORD_FIELDS = ['game', 'offset', 'white', 'black', 'result', 'reason', 'side', 'engine',
+                 'eval', 'ply']
+
+
 def print_progress(iteration, total, prefix=''):
-    percent = (iteration / total) * 100
-    if total > 0:
-        percent = min(percent, 100)
+    import colorama
+    # An empty input is complete from the start.
+    percent = min(iteration / total * 100, 100) if total > 0 else 100
     sys.stdout.write(f'\r{colorama.Fore.GREEN}{prefix} : {percent:.0f}% Complete')
     sys.stdout.flush()
 
 
-def delete_output_files():
-    output_folder = 'output'
+def delete_output_files(output_folder='output'):
     if not os.path.exists(output_folder):
         os.makedirs(output_folder)
     for filename in os.listdir(output_folder):
@@ -39,273 +105,2215 @@ def delete_output_files():
 
 
 def open_output_folder():
+    if os.name != 'nt':
+        return
+    import subprocess
     output_folder = os.path.abspath('output')
     subprocess.Popen(['explorer.exe', output_folder])
 
 
-def create_no_bad_games_file():
-    output_folder = 'output'
+def create_no_bad_games_file(output_folder='output'):
     if not os.path.exists(output_folder):
         os.makedirs(output_folder)
     with open(os.path.join(output_folder, 'no_bad_games_found.txt'), 'w') as f:
         f.write("no bad games were found in this pgn.")
 
 
-def merge_duplicate_entries(file_path):
-    player_stats = defaultdict(int)
-    
-    with open(file_path, 'r') as f:
-        for line in f:
-            if line.strip():
-                parts = line.split('=')
-                if len(parts) == 2:
-                    player_name, score = parts
-                    player_stats[player_name.strip()] += int(score.strip())
-    
-    with open(file_path, 'w') as f:
-        for player_name, total_score in player_stats.items():
-            f.write(f"{player_name} = {total_score}\n")
+def auto_int(value):
+    """argparse type for options that accept either an integer or 'auto'."""
+    if value.lower() == 'auto':
+        return None
+    return int(value)
 
 
-def main():
+def seconds(value):
+    """argparse type for a time in seconds that may have a fraction.
+
+    Whole seconds stay an int, so the cache keys of earlier runs, written as
+    Limit(time=1), still match.
+    """
+    value = float(value)
+    return int(value) if value.is_integer() else value
+
+
+def available_cores():
+    if hasattr(os, 'sched_getaffinity'):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+
+def physical_memory_mb():
+    """Returns the physical memory in MB, or None if it can not be determined."""
+    try:
+        return os.sysconf('SC_PHYS_PAGES') * os.sysconf('SC_PAGE_SIZE') // (1024 * 1024)
+    except (AttributeError, ValueError, OSError):
+        pass
+    try:
+        import psutil
+        return psutil.virtual_memory().total // (1024 * 1024)
+    except ImportError:
+        return None
+
+
+def plan_engine_resources(workers, threads, hash_mb, pools=1):
+    """Fills in the values left as None ('auto') so that the machine stays busy.
+
+    Short fixed-time searches scale much better across engine processes than
+    across search threads, so when both are automatic every core gets its own
+    single-threaded engine. Half of the physical memory is shared out as hash,
+    capped at 1024 MB per engine since a few seconds of search can not fill
+    more than that. pools is the number of engine pools that run at the same
+    time, one per shard and engine, each with workers engines; the cores and
+    memory are divided between them.
+    """
+    cores = max(1, available_cores() // pools)
+    if workers is None and threads is None:
+        workers, threads = cores, 1
+    elif workers is None:
+        workers = max(1, cores // threads)
+    elif threads is None:
+        threads = max(1, cores // workers)
+
+    if hash_mb is None:
+        memory_mb = physical_memory_mb() or 4096
+        per_engine = max(16, memory_mb // 2 // (workers * pools))
+        hash_mb = 16
+        while hash_mb * 2 <= min(per_engine, 1024):
+            hash_mb *= 2
+
+    return workers, threads, hash_mb
+
+
+def validate_engine_options(engine, options):
+    """Drops or clamps options the engine does not advertise or accept."""
+    import colorama
+    valid = {}
+    for name, value in options.items():
+        option = engine.options.get(name)
+        if option is None:
+            print(f'{colorama.Fore.YELLOW}engine has no {name} option, ignoring {name}={value}')
+            continue
+        if option.min is not None and value < option.min:
+            print(f'{colorama.Fore.YELLOW}{name}={value} is below the engine minimum, using {option.min}')
+            value = option.min
+        if option.max is not None and value > option.max:
+            print(f'{colorama.Fore.YELLOW}{name}={value} is above the engine maximum, using {option.max}')
+            value = option.max
+        valid[name] = value
+    return valid
+
+
+class Stats:
+    """Timings and counters of a selection run, reported by --stats.
+
+    Stage times are wall-clock seconds spent in the main process: scanning the
+    raw input (scan), parsing flagged games up to the flagged position
+    (parse), hashing and adjudicating that position (board), looking it up in
+    the evaluation cache (cache), handing it to the engines (submit), waiting
+    for them (engine_wait) and writing outputs (write). engine_time is the sum
+    of the analysis times of all engines, so it can exceed the run time when
+    several engines work in parallel. engine_saved is the analysis time that
+    repeated positions and duplicate games took from earlier evaluations.
+    """
+
+    def __init__(self):
+        self.times = defaultdict(float)
+        self.counts = defaultdict(int)
+        self.engine_time = 0.0
+        self.engine_saved = 0.0
+
+    @contextmanager
+    def timer(self, stage):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.times[stage] += time.perf_counter() - start
+
+    def timed(self, stage, iterable):
+        """Iterates over iterable, timing each step as stage."""
+        iterator = iter(iterable)
+        while True:
+            with self.timer(stage):
+                item = next(iterator, None)
+            if item is None:
+                return
+            yield item
+
+    def add(self, name, value=1):
+        self.counts[name] += value
+
+    def state(self):
+        return {'times': dict(self.times), 'counts': dict(self.counts),
+                'engine_time': self.engine_time, 'engine_saved': self.engine_saved}
+
+    def merge(self, state):
+        for stage, seconds in state['times'].items():
+            self.times[stage] += seconds
+        for name, value in state['counts'].items():
+            self.counts[name] += value
+        self.engine_time += state['engine_time']
+        self.engine_saved += state['engine_saved']
+
+    def summary(self, elapsed):
+        counts = self.counts
+        engine_time = self.engine_time
+        lookups = counts['cache_hits'] + counts['cache_misses']
+        return {
+            'elapsed_sec': round(elapsed, 3),
+            'games': counts['games'],
+            'games_per_sec': round(counts['games'] / elapsed, 2) if elapsed else None,
+            'flagged_games': counts['flagged'],
+            'bad_games': counts['bad'],
+            'engine_calls': counts['engine_calls'],
+            'engine_nodes': counts['nodes'],
+            'engine_nps': round(counts['nodes'] / engine_time) if engine_time else None,
+            'engine_sec_per_call': round(engine_time / counts['engine_calls'], 3)
+            if counts['engine_calls'] else None,
+            'early_stops': counts['early_stops'],
+            'escalations': counts['escalations'],
+            'static_adjudications': counts['static_adjudications'],
+            'dedup': {
+                'duplicate_games': counts['duplicate_games'],
+                'duplicate_evals': counts['duplicate_evals'],
+                'repeated_positions': counts['memo_hits'],
+                'engine_sec_saved': round(self.engine_saved, 3),
+            },
+            'cache_hits': counts['cache_hits'],
+            'cache_misses': counts['cache_misses'],
+            'cache_hit_rate': round(counts['cache_hits'] / lookups, 3) if lookups else None,
+            'engine_sec': round(engine_time, 3),
+            'stage_sec': {stage: round(seconds, 3) for stage, seconds in sorted(self.times.items())},
+        }
+
+    def live_line(self, elapsed):
+        counts = self.counts
+        rate = counts['games'] / elapsed if elapsed else 0
+        return (f'{counts["games"]} games, {rate:.1f} games/sec, {counts["engine_calls"]} engine calls, '
+                f'{counts["cache_hits"]} cache hits, engine {self.engine_time:.1f}s, '
+                f'parse {self.times.get("parse", 0):.1f}s, write {self.times.get("write", 0):.1f}s')
+
+
+class EnginePool:
+    """A pool of UCI engine processes that analyse positions concurrently.
+
+    Every engine is owned by at most one worker thread at a time, so the
+    number of positions being analysed in parallel equals the number of
+    engines in the pool.
+    """
+
+    def __init__(self, enginefn, workers=1, options=None):
+        import chess.engine
+        from concurrent.futures import ThreadPoolExecutor
+        self.workers = max(1, workers)
+        self.executor = ThreadPoolExecutor(max_workers=self.workers)
+        started = [self.executor.submit(chess.engine.SimpleEngine.popen_uci, enginefn)
+                   for _ in range(self.workers)]
+        self.engines = [future.result() for future in started if future.exception() is None]
+        try:
+            # Raises the error of the first engine that did not start.
+            for future in started:
+                future.result()
+            self.name = self.engines[0].id.get('name', os.path.basename(enginefn))
+            self.options = validate_engine_options(self.engines[0], options or {})
+            for engine in self.engines:
+                engine.configure(self.options)
+        except BaseException:
+            self.quit()
+            raise
+        self.idle_engines = queue.Queue()
+        for engine in self.engines:
+            self.idle_engines.put(engine)
+
+    def _analyse(self, board, limit, settled=None):
+        engine = self.idle_engines.get()
+        try:
+            start = time.perf_counter()
+            if settled is None:
+                info = engine.analyse(board, limit)
+            else:
+                info = analyse_until_settled(engine, board, limit, settled)
+            info['analysis_time'] = time.perf_counter() - start
+            return info
+        finally:
+            self.idle_engines.put(engine)
+
+    def submit(self, board, limit, settled=None):
+        """Queues board for analysis and returns a future of the info dict.
+
+        If settled is given the search stops as soon as settled(info) is true.
+        """
+        return self.executor.submit(self._analyse, board, limit, settled)
+
+    def quit(self):
+        import chess.engine
+        # Searches that have not started are dropped, and engines that died are skipped.
+        self.executor.shutdown(wait=True, cancel_futures=True)
+        for engine in self.engines:
+            try:
+                engine.quit()
+            except chess.engine.EngineError:
+                pass
+
+
+class AsyncEnginePool:
+    """An EnginePool driven by asyncio instead of one thread per engine.
+
+    All engines are run by a single event loop in a background thread, with
+    the coroutine API of python-chess. submit returns the same futures as
+    EnginePool.submit, so the main thread keeps parsing ahead and writing
+    finished games while the loop feeds positions to whichever engine is idle.
+    """
+
+    def __init__(self, enginefn, workers=1, options=None):
+        import asyncio
+        self.workers = max(1, workers)
+        self.loop = asyncio.new_event_loop()
+        self.thread = threading.Thread(target=self.loop.run_forever, daemon=True)
+        self.thread.start()
+        self.engines = []
+        try:
+            self._run(self._start(enginefn, options or {}))
+        except BaseException:
+            self.quit()
+            raise
+
+    def _run(self, coro):
+        import asyncio
+        return asyncio.run_coroutine_threadsafe(coro, self.loop).result()
+
+    async def _start(self, enginefn, options):
+        import asyncio
+        import chess.engine
+        started = await asyncio.gather(
+            *(chess.engine.popen_uci(enginefn) for _ in range(self.workers)),
+            return_exceptions=True)
+        self.engines = [item[1] for item in started if not isinstance(item, BaseException)]
+        for item in started:
+            if isinstance(item, BaseException):
+                raise item
+        self.name = self.engines[0].id.get('name', os.path.basename(enginefn))
+        self.options = validate_engine_options(self.engines[0], options)
+        await asyncio.gather(*(engine.configure(self.options) for engine in self.engines))
+        self.idle_engines = asyncio.Queue()
+        for engine in self.engines:
+            self.idle_engines.put_nowait(engine)
+
+    async def _analyse(self, board, limit, settled=None):
+        engine = await self.idle_engines.get()
+        try:
+            start = time.perf_counter()
+            if settled is None:
+                info = await engine.analyse(board, limit)
+            else:
+                info = await analyse_until_settled_async(engine, board, limit, settled)
+            info['analysis_time'] = time.perf_counter() - start
+            return info
+        finally:
+            self.idle_engines.put_nowait(engine)
+
+    def submit(self, board, limit, settled=None):
+        """Queues board for analysis and returns a future of the info dict.
+
+        If settled is given the search stops as soon as settled(info) is true.
+        """
+        import asyncio
+        return asyncio.run_coroutine_threadsafe(self._analyse(board, limit, settled), self.loop)
+
+    async def _quit(self):
+        import asyncio
+        await asyncio.gather(*(engine.quit() for engine in self.engines), return_exceptions=True)
+
+    def quit(self):
+        self._run(self._quit())
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.thread.join()
+        self.loop.close()
+
+
+class LazyEnginePool:
+    """Starts an engine pool on first use, with start().
+
+    Most small inputs have no flagged positions at all, and then no engine
+    is started. workers must be known up front, for the read ahead. commands,
+    the engine files of the pool, let EvalCache name it without starting it.
+    """
+
+    def __init__(self, start, workers, commands=None):
+        self.start = start
+        self.workers = workers
+        self.commands = commands
+        self.pool = None
+
+    def _started(self):
+        if self.pool is None:
+            self.pool = self.start()
+        return self.pool
+
+    @property
+    def name(self):
+        return self._started().name
+
+    def submit(self, board, limit, settled=None):
+        return self._started().submit(board, limit, settled)
+
+    def quit(self):
+        if self.pool is not None:
+            self.pool.quit()
+
+
+class ConsensusPool:
+    """Evaluates each position with several engine pools at once and combines the scores.
+
+    Every pool searches the position concurrently with the same limit, so the
+    consensus costs no extra wall time. The combined score is the median of
+    the pools' scores. When the pools disagree about which side of a threshold
+    (0 and +/- score_margin) the position is on, or when a score lies within
+    band pawns of one, all pools search again with escalate_limit. Escalations
+    draw on a budget of engine seconds shared by the whole run; once it is
+    spent, the first consensus is used. Has the interface of EnginePool.
+    """
+
+    def __init__(self, pools, score_margin, escalate_limit, band=1.0, budget=None):
+        self.pools = pools
+        self.workers = min(pool.workers for pool in pools)
+        self.name = '+'.join(pool.name for pool in pools)
+        self.options = pools[0].options
+        self.score_margin = score_margin
+        self.escalate_limit = escalate_limit
+        self.band = band
+        self.budget = budget
+        self.budget_lock = threading.Lock()
+
+    def _side(self, score_wpov):
+        """Returns which interval between the thresholds score_wpov is in, or None if near one."""
+        thresholds = (-self.score_margin, 0, self.score_margin)
+        if any(abs(score_wpov - threshold) < self.band for threshold in thresholds):
+            return None
+        return sum(score_wpov > threshold for threshold in thresholds)
+
+    def _take_budget(self):
+        seconds = self.escalate_limit.time * len(self.pools)
+        with self.budget_lock:
+            if self.budget is not None:
+                if self.budget < seconds:
+                    return False
+                self.budget -= seconds
+        return True
+
+    def _gather(self, board, limit, settled, done):
+        """Searches board with every pool, calls done with their futures and returns them."""
+        futures = [pool.submit(board, limit, copy.deepcopy(settled)) for pool in self.pools]
+        remaining = [len(futures)]
+        lock = threading.Lock()
+
+        def finished(_):
+            with lock:
+                remaining[0] -= 1
+                if remaining[0]:
+                    return
+            done(futures)
+
+        for future in futures:
+            future.add_done_callback(finished)
+        return futures
+
+    def _combine(self, infos, escalated):
+        import statistics
+        import chess.engine
+        scores = [info['score'].white().score(mate_score=32000) for info in infos]
+        return {
+            'score': chess.engine.PovScore(chess.engine.Cp(round(statistics.median(scores))),
+                                           chess.WHITE),
+            'consensus': [score / 100 for score in scores], 'escalated': escalated,
+            'stopped_early': any(info.get('stopped_early') for info in infos),
+            'nodes': sum(info.get('nodes', 0) for info in infos),
+            'analysis_time': sum(info['analysis_time'] for info in infos),
+        }
+
+    def submit(self, board, limit, settled=None):
+        """Queues board for analysis by every pool and returns a future of the consensus.
+
+        Cancelling the future cancels the searches of the pools as well.
+        """
+        from concurrent.futures import Future, InvalidStateError
+        result = Future()
+        searches = []
+
+        def gather(limit, settled, done):
+            searches.extend(self._gather(board, limit, settled, done))
+            if result.cancelled():
+                cancel_searches(result)
+
+        def cancel_searches(_):
+            if result.cancelled():
+                for search in searches:
+                    search.cancel()
+
+        def finish(outcome, value):
+            # The future can be cancelled at any time until it is done.
+            try:
+                outcome(value)
+            except InvalidStateError:
+                pass
+
+        def escalated(first_infos, futures):
+            if result.cancelled():
+                return
+            try:
+                info = self._combine([future.result() for future in futures], True)
+                info['analysis_time'] += sum(info['analysis_time'] for info in first_infos)
+                finish(result.set_result, info)
+            except Exception as e:
+                finish(result.set_exception, e)
+
+        def first(futures):
+            if result.cancelled():
+                return
+            try:
+                infos = [future.result() for future in futures]
+                sides = {self._side(info['score'].white().score(mate_score=32000) / 100)
+                         for info in infos}
+                if (len(sides) > 1 or None in sides) and self._take_budget():
+                    gather(self.escalate_limit, None, lambda futures: escalated(infos, futures))
+                else:
+                    finish(result.set_result, self._combine(infos, False))
+            except Exception as e:
+                finish(result.set_exception, e)
+
+        result.add_done_callback(cancel_searches)
+        gather(limit, settled, first)
+        return result
+
+    def quit(self):
+        for pool in self.pools:
+            pool.quit()
+
+
+class OutputWriter:
+    """A buffered output file that is opened once and moved into place on close.
+
+    Games are written to '<path>.part', which replaces path only when the run
+    finishes, so an interrupted run never leaves a truncated output behind. In
+    append mode an existing file is moved to the .part file first and then
+    continued. The file is opened on the first write, so outputs that receive
+    nothing are not created. Buffered data is flushed to disk every
+    flush_interval seconds.
+    """
+
+    def __init__(self, path, append=False, flush_interval=10.0):
+        self.path = path
+        self.part_path = f'{path}.part'
+        self.append = append
+        self.flush_interval = flush_interval
+        self.f = None
+        self.last_flush = time.monotonic()
+
+    def _open(self):
+        if self.append and os.path.exists(self.path):
+            os.replace(self.path, self.part_path)
+        self.f = open(self.part_path, 'ab' if self.append else 'wb', buffering=1024 * 1024)
+
+    def write(self, data):
+        if self.f is None:
+            self._open()
+        self.f.write(data)
+        if time.monotonic() - self.last_flush >= self.flush_interval:
+            self.flush()
+
+    def write_game(self, raw):
+        """Writes a game verbatim, making sure a blank line follows it."""
+        if not raw.endswith((b'\n\n', b'\r\n\r\n')):
+            raw += b'\n' if raw.endswith(b'\n') else b'\n\n'
+        self.write(raw)
+
+    def tell(self):
+        """Returns the size of the output so far, including the content appended to."""
+        if self.f is not None:
+            return self.f.tell()
+        if self.append and os.path.exists(self.path):
+            return os.path.getsize(self.path)
+        return 0
+
+    def resume(self, size):
+        """Continues the output of an interrupted run from a checkpointed size."""
+        # A cancelled run has already moved its outputs into place.
+        if not os.path.exists(self.part_path) and os.path.exists(self.path):
+            os.replace(self.path, self.part_path)
+        if os.path.exists(self.part_path):
+            self.f = open(self.part_path, 'r+b', buffering=1024 * 1024)
+        elif size:
+            self._open()
+        else:
+            return
+        self.f.truncate(size)
+        self.f.seek(size)
+
+    def flush(self, sync=False):
+        if self.f is not None:
+            self.f.flush()
+            if sync:
+                os.fsync(self.f.fileno())
+        self.last_flush = time.monotonic()
+
+    def close(self):
+        if self.f is not None:
+            self.f.close()
+            self.f = None
+            os.replace(self.part_path, self.path)
+
+
+def score_to_row(info):
+    """Returns the (cp, mate) columns of an info dict's white point of view score."""
+    score = info['score'].white()
+    return score.score(), score.mate()
+
+
+def info_from_row(cp, mate):
+    import chess.engine
+    score = chess.engine.Mate(mate) if mate is not None else chess.engine.Cp(cp)
+    return {'score': chess.engine.PovScore(score, chess.WHITE)}
+
+
+class EvalCache:
+    """An on-disk cache of engine evaluations, stored in SQLite.
+
+    Entries are keyed by the normalised position, the engine name and the
+    search limit, so re-running a selection with another score margin reuses
+    every evaluation. When the cache holds more than max_entries evaluations
+    the least recently used ones are evicted.
+    """
+
+    def __init__(self, path, max_entries=1000000):
+        import sqlite3
+        self.max_entries = max_entries
+        # Shard processes share the file, so every statement commits on its
+        # own and waits for the writes of the others.
+        self.db = sqlite3.connect(path, timeout=60, isolation_level=None, check_same_thread=False)
+        self.db.execute('PRAGMA journal_mode=WAL')
+        self.db.execute('CREATE TABLE IF NOT EXISTS evals ('
+                        'key TEXT PRIMARY KEY, cp INTEGER, mate INTEGER, last_used REAL)')
+        self.db.execute('CREATE INDEX IF NOT EXISTS evals_last_used ON evals (last_used)')
+        self.db.execute('CREATE TABLE IF NOT EXISTS engines (files TEXT PRIMARY KEY, name TEXT)')
+        self.entries = self.db.execute('SELECT COUNT(*) FROM evals').fetchone()[0]
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def make_key(board, engine_name, limit):
+        # The move number does not change the evaluation, the halfmove clock
+        # and the moves since the last capture or pawn move (repetitions) can.
+        reversible = board.move_stack[max(0, len(board.move_stack) - board.halfmove_clock):]
+        history = ' '.join(move.uci() for move in reversible)
+        return f'{board.epd()} {board.halfmove_clock} {history}|{engine_name}|{limit}'
+
+    def engine_name(self, pool):
+        """Returns the name of pool for the cache keys.
+
+        The name the engines report is remembered per engine file, size and
+        modification time, so a pool with commands is only started to name
+        engines that are new or were changed.
+        """
+        files = []
+        for command in getattr(pool, 'commands', None) or []:
+            path = shutil.which(command) or command
+            try:
+                stat = os.stat(path)
+            except OSError:
+                return pool.name
+            files.append([os.path.abspath(path), stat.st_size, stat.st_mtime_ns])
+        if not files:
+            return pool.name
+        files = json.dumps(files)
+        row = self.db.execute('SELECT name FROM engines WHERE files = ?', (files,)).fetchone()
+        if row is not None:
+            return row[0]
+        name = pool.name
+        self.db.execute('INSERT OR REPLACE INTO engines VALUES (?, ?)', (files, name))
+        return name
+
+    def get(self, *keys):
+        """Returns a cached info dict with a white point of view score, or None.
+
+        Of several keys, the first one cached is used. Either way the lookup
+        counts as one hit or miss.
+        """
+        for key in keys:
+            row = self.db.execute('SELECT cp, mate FROM evals WHERE key = ?', (key,)).fetchone()
+            if row is not None:
+                self.hits += 1
+                self.db.execute('UPDATE evals SET last_used = ? WHERE key = ?', (time.time(), key))
+                return info_from_row(*row)
+        self.misses += 1
+        return None
+
+    def put(self, key, info):
+        self.db.execute('INSERT OR REPLACE INTO evals VALUES (?, ?, ?, ?)',
+                        (key, *score_to_row(info), time.time()))
+        self.entries += 1
+        if self.entries > self.max_entries:
+            # Evict a tenth at a time so that eviction does not run on every insert.
+            keep = self.max_entries * 9 // 10
+            self.db.execute('DELETE FROM evals WHERE key IN ('
+                            'SELECT key FROM evals ORDER BY last_used LIMIT ?)',
+                            (self.entries - keep,))
+            self.entries = keep
+
+    def close(self):
+        self.db.close()
+
+
+class ResumeError(Exception):
+    """Raised when --resume can not continue the interrupted run."""
+
+
+class Journal:
+    """An append-only JSON lines record of the progress of a run, used by --resume.
+
+    The first line describes the run. It is followed by one line per engine
+    evaluation and, at every flush of the outputs, a checkpoint line with
+    the input offset, the output file sizes and the report state that
+    together describe everything written so far.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.f = None
+
+    def start(self, header):
+        self.f = open(self.path, 'w')
+        self._write(dict(header, type='start'))
+
+    def load(self):
+        """Returns the start header, the last checkpoint and the evaluations by game offset."""
+        header, checkpoint, evals = None, None, {}
+        with open(self.path) as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    # The last line may be cut short by the interruption.
+                    break
+                if record['type'] == 'start':
+                    header = record
+                elif record['type'] == 'checkpoint':
+                    checkpoint = record
+                elif record['type'] == 'eval':
+                    evals[record['offset']] = dict(info_from_row(record['cp'], record['mate']),
+                                                   stopped_early=record['stopped_early'])
+        self.f = open(self.path, 'a')
+        return header, checkpoint, evals
+
+    def _write(self, record):
+        self.f.write(json.dumps(record) + '\n')
+
+    def record_eval(self, offset, info):
+        cp, mate = score_to_row(info)
+        self._write({'type': 'eval', 'offset': offset, 'cp': cp, 'mate': mate,
+                     'stopped_early': bool(info.get('stopped_early'))})
+
+    def checkpoint(self, state):
+        self._write(dict(state, type='checkpoint'))
+        self.f.flush()
+        os.fsync(self.f.fileno())
+
+    def remove(self):
+        self.f.close()
+        os.remove(self.path)
+
+
+def keyword_in_comment(keyword, comment, result):
+    """Checks a termination keyword against a move comment.
+
+    Keywords such as 'but bare king} 1/2-1/2' include the closing brace and
+    the game result, which are not part of the comment text itself.
+    """
+    text, _, keyword_result = keyword.partition('} ')
+    return text in comment and (not keyword_result or keyword_result == result)
+
+
+def iter_raw_games(h, chunk_size=4 * 1024 * 1024, start=0, end=None):
+    """Yields (offset, end_offset, raw_bytes, flagged) for each game of a binary PGN file.
+
+    The file is read in large chunks. Game boundaries and termination keywords
+    are both found with one compiled regex search over each chunk, so no Python
+    code runs per line. Only one chunk plus one unfinished game is held in
+    memory at a time. flagged tells whether the raw game text contains a
+    termination keyword. start is the offset of the current position of h,
+    and reading stops at end if it is given.
+    """
+    buf = b''
+    offset = start
+    while True:
+        if end is None:
+            chunk = h.read(chunk_size)
+        else:
+            chunk = h.read(min(chunk_size, end - offset - len(buf)))
+        buf += chunk
+        # Without more data the last game in buf may still be incomplete.
+        starts = [match.end() for match in GAME_START_RE.finditer(buf)]
+        if not chunk:
+            starts.append(len(buf))
+        if starts:
+            flagged_at = [match.start() for match in TERMINATION_RE.finditer(buf, 0, starts[-1])]
+            i = 0
+            game_start = 0
+            for game_end in starts:
+                flagged = False
+                while i < len(flagged_at) and flagged_at[i] < game_end:
+                    flagged = True
+                    i += 1
+                if buf[game_start:game_end].strip():
+                    yield offset + game_start, offset + game_end, buf[game_start:game_end], flagged
+                game_start = game_end
+            buf = buf[game_start:]
+            offset += game_start
+        if not chunk:
+            break
+
+
+class PgnIndex:
+    """A sidecar index of where each game of a PGN file starts.
+
+    The index is a compact array of game byte offsets, one more than there are
+    games so that the last entry is the end of the last game, and an array
+    with a 64-bit hash of the header block of every game. It is built in one
+    regex pass over the memory-mapped PGN, with the same game boundaries as
+    iter_raw_games, and saved as '<pgn>.idx'. Later runs map the saved index
+    instead, as long as the size and mtime of the PGN are unchanged, so
+    counting games and seeking to game n take constant time. When games were
+    only appended to the PGN, the saved index is extended from its last game
+    on instead of being rebuilt. Games are numbered from 0.
+    """
+
+    MAGIC = b'GSIDX2' + sys.byteorder[0].encode() + b'\0'
+    HEADER = struct.Struct('<8sQqQ')
+
+    def __init__(self, offsets, hashes, mm=None):
+        self.offsets = offsets
+        self.hashes = hashes
+        self.mm = mm
+
+    @classmethod
+    def saved(cls, fn, path=None):
+        """Returns the saved index of fn if it is up to date, without building one."""
+        st = os.stat(fn)
+        return cls.load(path or f'{fn}.idx', st.st_size, st.st_mtime_ns)
+
+    @classmethod
+    def open(cls, fn, path=None):
+        """Returns the index of fn, loaded from path or built and saved there."""
+        path = path or f'{fn}.idx'
+        st = os.stat(fn)
+        index = cls.load(path, st.st_size, st.st_mtime_ns)
+        if index is None:
+            index = cls.build(fn, cls.load(path))
+            try:
+                index.save(path, st.st_size, st.st_mtime_ns)
+            except OSError:
+                pass  # A read-only folder only costs a rebuild next time.
+        return index
+
+    @classmethod
+    def load(cls, path, size=None, mtime_ns=None):
+        """Maps a saved index, or returns None if it is missing or stale.
+
+        Without size and mtime_ns, any saved index is returned, with the size
+        it was built for as its size attribute.
+        """
+        try:
+            with open(path, 'rb') as f:
+                mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError):
+            return None
+        if len(mm) >= cls.HEADER.size:
+            magic, saved_size, saved_mtime_ns, count = cls.HEADER.unpack_from(mm)
+            expected = cls.HEADER.size + (2 * count + 1) * 8
+            if size is None:
+                size, mtime_ns = saved_size, saved_mtime_ns
+            if (magic, saved_size, saved_mtime_ns, len(mm)) == (cls.MAGIC, size, mtime_ns, expected):
+                view = memoryview(mm)[cls.HEADER.size:].cast('Q')
+                index = cls(view[:count + 1], view[count + 1:], mm)
+                index.size = saved_size
+                return index
+        mm.close()
+        return None
+
+    @classmethod
+    def build(cls, fn, previous=None):
+        """Indexes fn, continuing from previous if fn only grew since it was indexed."""
+        offsets = array.array('Q')
+        hashes = array.array('Q')
+        size = os.path.getsize(fn)
+        if size:
+            with open(fn, 'rb') as h, mmap.mmap(h.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                start = 0
+                if previous is not None and len(previous) > 1 and previous.size <= size:
+                    # The last indexed game may have been incomplete, so it is indexed again.
+                    kept = len(previous) - 1
+                    if all(cls.header_hash(mm, *previous.game_range(n)) == previous.hashes[n]
+                           for n in (0, kept - 1)):
+                        start = previous.offsets[kept]
+                        offsets.frombytes(previous.offsets[:kept].tobytes())
+                        hashes.frombytes(previous.hashes[:kept].tobytes())
+                if previous is not None:
+                    previous.close()
+                # Boundaries go straight into the arrays, without a list of all of them.
+                ends = (match.end() for match in GAME_START_RE.finditer(mm, start))
+                for end in itertools.chain(ends, [size]):
+                    # Only the whitespace at the end of an empty file is not a game.
+                    if NON_SPACE_RE.search(mm, start, end) is not None:
+                        offsets.append(start)
+                        hashes.append(cls.header_hash(mm, start, end))
+                    start = end
+                if offsets:
+                    offsets.append(size)
+        elif previous is not None:
+            previous.close()
+        if not offsets:
+            offsets.append(0)
+        return cls(offsets, hashes)
+
+    @staticmethod
+    def header_hash(mm, start, end):
+        """Returns the 64-bit hash of the header block of the game from start to end."""
+        match = HEADER_END_RE.search(mm, start, end)
+        header = mm[start:match.start() if match else end]
+        return int.from_bytes(hashlib.blake2b(header, digest_size=8).digest(), 'little')
+
+    def save(self, path, size, mtime_ns):
+        with open(f'{path}.part', 'wb') as f:
+            f.write(self.HEADER.pack(self.MAGIC, size, mtime_ns, len(self)))
+            f.write(bytes(self.offsets))
+            f.write(bytes(self.hashes))
+        os.replace(f'{path}.part', path)
+
+    def __len__(self):
+        return len(self.hashes)
+
+    def game_range(self, n):
+        """Returns the start and end byte offsets of game n."""
+        return self.offsets[n], self.offsets[n + 1]
+
+    def read_game(self, h, n):
+        """Reads the raw bytes of game n from the binary file h."""
+        start, end = self.game_range(n)
+        h.seek(start)
+        return h.read(end - start)
+
+    def game_at(self, offset):
+        """Returns the number of the game that contains byte offset."""
+        return max(bisect.bisect_right(self.offsets, offset, 0, len(self)) - 1, 0)
+
+    def close(self):
+        if self.mm is not None:
+            self.offsets.release()
+            self.hashes.release()
+            self.mm.close()
+            self.mm = None
+
+
+@functools.lru_cache(maxsize=None)
+def flagged_game_visitor():
+    """Returns the FlaggedGameVisitor class, defined on first use with chess.pgn."""
+    import chess.pgn
+
+    class FlaggedGameVisitor(chess.pgn.BaseVisitor):
+        """Reads a game in one pass over its mainline, without building a game tree.
+
+        The parser keeps a single board that is updated move by move. At the first
+        mainline comment that contains a termination keyword, a copy of that board
+        is kept as flagged_board, including the move stack, so the engine sees the
+        whole history and can detect repetitions. Variations are skipped. The
+        headers and all mainline comments are collected for the bad game report.
+        """
+
+        def begin_game(self):
+            self.headers = chess.pgn.Headers()
+            self.comments = []
+            self.comment = None
+            self.board = None
+            self.flagged_board = None
+            self.flagged_comment = None
+
+        def visit_header(self, tagname, tagvalue):
+            self.headers[tagname] = tagvalue
+
+        def visit_board(self, board):
+            self.board = board
+
+        def begin_variation(self):
+            return chess.pgn.SKIP
+
+        def visit_move(self, board, move):
+            self._end_node()
+            self.comment = ''
+
+        def visit_comment(self, comment):
+            # Comments before the first move belong to the game, not to a move.
+            if self.comment is not None:
+                self.comment = f'{self.comment} {comment}' if self.comment else comment
+
+        def _end_node(self):
+            if self.comment is None:
+                return
+            self.comments.append(self.comment)
+            if self.flagged_board is None and any(
+                    keyword_in_comment(keyword, self.comment, self.headers['Result'])
+                    for keyword in TERMINATION_KEYWORDS):
+                self.flagged_board = self.board.copy()
+                self.flagged_comment = self.comment
+
+        def handle_error(self, error):
+            # Like chess.pgn.GameBuilder, keep going with what could be parsed.
+            pass
+
+        def end_game(self):
+            self._end_node()
+            self.comment = None
+
+        def result(self):
+            return self
+
+    return FlaggedGameVisitor
+
+
+def classify_bad_game(headers, comments):
+    """Returns the reason code and the side to blame for a bad game.
+
+    Both are None when none of the comments names a known reason.
+    """
+    result = headers['Result']
+    found = set()
+    for comment in comments:
+        for reason, keywords in BAD_GAME_REASONS:
+            if any(keyword_in_comment(keyword, comment, result) for keyword in keywords):
+                found.add(reason)
+                break
+
+    for reason, _ in REPORT_ORDER:
+        if reason in found:
+            if reason == 'bare_king':
+                side = 'White' if result == '1/2-1/2' else 'Black'
+            else:
+                side = 'White' if result == '0-1' else 'Black'
+            return reason, side
+    return None, None
+
+
+def report_bad_game(headers, comments, player_totals):
+    """Returns the report lines for a bad game and counts it for the loser."""
+    white_engine_name = headers['White']
+    black_engine_name = headers['Black']
+    result = headers['Result']
+
+    report_lines = []
+    if result == '0-1' or result == '1-0' or result == '1/2-1/2':
+        report_lines.append(f"White: {white_engine_name}")
+        report_lines.append(f"Black: {black_engine_name}")
+    reason, side = classify_bad_game(headers, comments)
+    if reason is not None:
+        report_lines.append(f"{dict(REPORT_ORDER)[reason]} [{side}]")
+        name = white_engine_name if side == 'White' else black_engine_name
+        player_totals[f"{name}_total_bad_games"] += 1
+    return report_lines
+
+
+def bad_game_record(decision):
+    """Returns the record of a bad game as a dict with the RECORD_FIELDS keys."""
+    import chess
+    headers = decision.headers
+    reason, side = classify_bad_game(headers, decision.comments)
+    return {
+        'game': decision.game_num, 'offset': decision.offset,
+        'white': headers['White'], 'black': headers['Black'], 'result': headers['Result'],
+        'reason': reason or '', 'side': side or '',
+        'engine': headers[side] if side else '',
+        'eval': decision.score, 'ply': chess.Board(decision.fen).ply(),
+    }
+
+
+def format_records(records, csv_format, header=False):
+    """Encodes records as CSV rows or JSON lines."""
+    if not csv_format:
+        return ''.join(json.dumps(record) + '\n' for record in records).encode()
+    out = io.StringIO()
+    writer = csv.DictWriter(out, RECORD_FIELDS, lineterminator='\n')
+    if header:
+        writer.writeheader()
+    writer.writerows(records)
+    return out.getvalue().encode()
+
+
+def read_records(path):
+    """Yields the records of a CSV or JSON lines bad game records file."""
+    with open(path, newline='') as f:
+        if path.endswith('.csv'):
+            yield from csv.DictReader(f)
+        else:
+            yield from map(json.loads, f)
+
+
+def engine_totals(records):
+    """Totals bad games per engine and reason in a single pass over records.
+
+    Returns one row per engine with its bad game count and a column per
+    reason code, sorted by bad games, most first.
+    """
+    counts = Counter((record['engine'], record['reason']) for record in records
+                     if record['engine'])
+    totals = defaultdict(lambda: dict.fromkeys([reason for reason, _ in REPORT_ORDER], 0))
+    for (engine, reason), count in counts.items():
+        totals[engine][reason] = count
+    rows = [{'engine': engine, 'bad_games': sum(row.values()), **row}
+            for engine, row in totals.items()]
+    return sorted(rows, key=lambda row: (-row['bad_games'], row['engine']))
+
+
+def write_engine_totals(path, rows):
+    """Writes the engine_totals rows as CSV or JSON lines, by file extension."""
+    with open(path, 'w', newline='') as f:
+        if path.endswith('.csv'):
+            writer = csv.DictWriter(f, ['engine', 'bad_games'] + [r for r, _ in REPORT_ORDER],
+                                    lineterminator='\n')
+            writer.writeheader()
+            writer.writerows(rows)
+        else:
+            f.writelines(json.dumps(row) + '\n' for row in rows)
+
+
+def is_game_removed(result, score_wpov, score_margin):
+    """Returns True if a flagged game with this evaluation should be removed."""
+    return (result == '0-1' and score_wpov > -score_margin) or \
+           (result == '1/2-1/2' and score_wpov > 0 and score_wpov > -score_margin) or \
+           (result == '1-0' and score_wpov < score_margin) or \
+           (result == '1/2-1/2' and score_wpov > 0 and score_wpov < score_margin)
+
+
+class MarginSettled:
+    """Tells an adaptive search when its evaluation can no longer change the verdict.
+
+    The search is settled once the last `depths` completed depths all gave the
+    same verdict, each with a score at least `band` pawns away from every
+    threshold (0 and +/- score_margin) that could flip it.
+    """
+
+    def __init__(self, result, score_margin, band=1.0, depths=3):
+        self.result = result
+        self.score_margin = score_margin
+        self.band = band
+        self.depths = depths
+        self.by_depth = {}
+
+    def __call__(self, info):
+        if 'score' not in info or 'depth' not in info \
+                or info.get('lowerbound') or info.get('upperbound'):
+            return False
+        score_wpov = info['score'].white().score(mate_score=32000) / 100
+        far = all(abs(score_wpov - threshold) >= self.band
+                  for threshold in (-self.score_margin, 0, self.score_margin))
+        self.by_depth[info['depth']] = (far, is_game_removed(self.result, score_wpov, self.score_margin))
+        last = [self.by_depth[depth] for depth in sorted(self.by_depth)[-self.depths:]]
+        return len(last) == self.depths and all(far for far, _ in last) \
+            and len({removed for _, removed in last}) == 1
+
+
+def analyse_until_settled(engine, board, limit, settled):
+    """Streams an analysis and stops it as soon as settled(info) returns True."""
+    with engine.analysis(board, limit) as analysis:
+        for info in analysis:
+            if settled(info):
+                return dict(analysis.info, stopped_early=True)
+        return dict(analysis.info)
+
+
+async def analyse_until_settled_async(engine, board, limit, settled):
+    """The coroutine version of analyse_until_settled."""
+    with await engine.analysis(board, limit) as analysis:
+        async for info in analysis:
+            if settled(info):
+                return dict(analysis.info, stopped_early=True)
+        return dict(analysis.info)
+
+
+def print_decision(decision):
+    """Prints the verdict for a flagged game."""
+    import colorama
+    print(f' ')
+    print(f'\ngame_num: {decision.game_num}, result: {decision.headers["Result"]}, '
+          f'comment: {decision.comment}')
+    print(f'fen: {decision.fen}')
+    if decision.source == 'static':
+        print(f'adjudicated without engine: {decision.info["adjudication"]}')
+    if 'consensus' in decision.info:
+        escalated = ', escalated' if decision.info.get('escalated') else ''
+        print(f'consensus: {", ".join(map(str, decision.info["consensus"]))}{escalated}')
+    print(f' ')
+
+    score_wpov = decision.score
+    if decision.verdict == 'bad':
+        print(f'{colorama.Fore.RED}{colorama.Style.BRIGHT}will not keep this game, eval: {score_wpov} wpov{colorama.Style.RESET_ALL}')
+        print(f'\n ')
+    else:
+        print(f'{colorama.Fore.YELLOW}{colorama.Style.BRIGHT}this game will be kept, eval: {score_wpov} wpov{colorama.Style.RESET_ALL}')
+        print(f' ')
+
+
+class Decision(namedtuple('Decision', ['game_num', 'offset', 'end_offset', 'raw', 'verdict',
+                                       'headers', 'comments', 'comment', 'fen', 'info', 'source'])):
+    """The outcome of select_games for one game.
+
+    verdict is 'good' for games without a termination comment, 'kept' for
+    flagged games that stay within the score margin and 'bad' for flagged
+    games that should be removed. headers and comments are only filled in for
+    games that were parsed, and comment, fen, info and source only for flagged
+    games. source tells where info came from: 'engine', 'cache', 'journal',
+    'static' for positions settled by StaticAdjudicator, 'memo' for a
+    position that was evaluated earlier in the run, or 'duplicate' for a
+    game whose movetext appeared earlier in the run.
+    offset and end_offset are None unless the games came from iter_raw_games.
+    """
+
+    __slots__ = ()
+
+    @property
+    def score(self):
+        """The evaluation in pawns from white's point of view, or None."""
+        if self.info is None:
+            return None
+        return self.info['score'].white().score(mate_score=32000) / 100
+
+
+class StaticAdjudicator:
+    """Evaluates the flagged positions that need no engine search.
+
+    These are checkmates, stalemates and positions with insufficient mating
+    material, and a bare king against a queen or rook that it cannot
+    capture right away. When Syzygy tablebase directories are given,
+    separated by os.pathsep, positions with few enough pieces are probed
+    there first, taking the 50-move rule into account. Returns an info dict
+    with a score and the reason in 'adjudication', or None.
+    """
+
+    WIN_CP = 10000
+
+    def __init__(self, syzygy=None):
+        import chess.syzygy
+        self.tablebase = None
+        if syzygy:
+            self.tablebase = chess.syzygy.Tablebase()
+            for directory in syzygy.split(os.pathsep):
+                self.tablebase.add_directory(directory)
+
+    @staticmethod
+    def _info(score, color, reason):
+        import chess.engine
+        return {'score': chess.engine.PovScore(score, color), 'adjudication': reason}
+
+    def _probe(self, board):
+        import chess.engine
+        try:
+            wdl = self.tablebase.probe_wdl(board)
+            if abs(wdl) == 2 and board.halfmove_clock:
+                # A win that takes too long to convert is a draw under the 50-move rule.
+                if abs(self.tablebase.probe_dtz(board)) + board.halfmove_clock > 100:
+                    wdl = 0
+        except KeyError:
+            return None
+        score = chess.engine.Cp(self.WIN_CP if wdl == 2 else -self.WIN_CP if wdl == -2 else 0)
+        return self._info(score, board.turn, 'tablebase')
+
+    def __call__(self, board):
+        import chess.engine
+        if board.is_checkmate():
+            return self._info(chess.engine.Mate(0), board.turn, 'checkmate')
+        if board.is_stalemate():
+            return self._info(chess.engine.Cp(0), board.turn, 'stalemate')
+        if board.is_insufficient_material():
+            return self._info(chess.engine.Cp(0), board.turn, 'insufficient material')
+        if self.tablebase is not None:
+            info = self._probe(board)
+            if info is not None:
+                return info
+
+        for strong in chess.COLORS:
+            weak = not strong
+            if board.occupied_co[weak] != board.kings & board.occupied_co[weak]:
+                continue
+            if not (board.pieces(chess.QUEEN, strong) or board.pieces(chess.ROOK, strong)):
+                continue
+            if board.turn == weak and any(board.is_capture(move) for move in board.legal_moves):
+                return None
+            return self._info(chess.engine.Cp(self.WIN_CP), strong, 'bare king')
+        return None
+
+    def close(self):
+        if self.tablebase is not None:
+            self.tablebase.close()
+
+
+class Evaluator:
+    """Evaluates the flagged positions of select_games with an EnginePool.
+
+    A position is first given to the adjudicator, if any, then looked up in
+    known_evals, by game offset, and then in the cache. Only positions none
+    of them can evaluate are sent to the engines. With memoize, a position
+    that was already submitted in this run, keyed by its Zobrist hash, shares
+    the evaluation of the first one, even while that is still running. A memo
+    dict can be given to share it with other Evaluators.
+    Engine results are then added to the cache. With adaptive set to
+    (score_margin, band, depths), searches stop early as described in
+    MarginSettled.
+
+    The time spent on a position is added to the board, cache and submit
+    stages of stats.
+
+    Any object with a workers attribute and a submit(board, result, offset)
+    method that returns (future, source) can be used instead.
+    """
+
+    def __init__(self, pool, limit, cache=None, adaptive=None, known_evals=None,
+                 adjudicator=None, memoize=True, memo=None, stats=None):
+        self.pool = pool
+        self.stats = stats or Stats()
+        self.adjudicator = adjudicator
+        self.memo = None
+        if memoize:
+            self.memo = memo if memo is not None else {}
+        self.workers = pool.workers
+        self.limit = limit
+        self.cache = cache
+        self.adaptive = adaptive
+        self.known_evals = known_evals or {}
+        self.limit_key = repr(limit)
+        self.engine_name = None
+        if adaptive is not None:
+            # An early stopped evaluation is only trustworthy for the margin it was made for.
+            self.adaptive_key = f'{self.limit_key},adaptive={"/".join(map(str, adaptive))}'
+        self.cache_lock = threading.Lock()
+
+    def _cache_engine_name(self):
+        if self.engine_name is None:
+            with self.cache_lock:
+                self.engine_name = self.cache.engine_name(self.pool)
+        return self.engine_name
+
+    def _cache_get(self, keys):
+        with self.cache_lock:
+            return self.cache.get(*keys)
+
+    def _cache_put(self, keys, future):
+        if future.cancelled():
+            return
+        info = future.result()
+        with self.cache_lock:
+            self.cache.put(keys[1] if info.get('stopped_early') else keys[0], info)
+
+    def submit(self, board, result, offset=None):
+        """Returns a future of the info dict for board and where it comes from."""
+        import chess.polyglot
+        if self.adjudicator is not None:
+            with self.stats.timer('board'):
+                info = self.adjudicator(board)
+            if info is not None:
+                return completed_future(info), 'static'
+
+        info = self.known_evals.get(offset)
+        if info is not None:
+            return completed_future(info), 'journal'
+
+        if self.memo is not None:
+            # The clock and repetitions are not in the hash but can change the evaluation.
+            with self.stats.timer('board'):
+                memo_key = (chess.polyglot.zobrist_hash(board), board.halfmove_clock,
+                            board.is_repetition(2))
+            future = self.memo.get(memo_key)
+            # A select_games that stopped early cancels the analyses it did not wait for.
+            if future is not None and not future.cancelled():
+                return future, 'memo'
+            future, source = self._evaluate(board, result)
+            self.memo[memo_key] = future
+            return future, source
+        return self._evaluate(board, result)
+
+    def _evaluate(self, board, result):
+        keys = None
+        if self.cache is not None:
+            with self.stats.timer('cache'):
+                # A full-length evaluation is good enough for adaptive runs too.
+                name = self._cache_engine_name()
+                keys = [EvalCache.make_key(board, name, self.limit_key)]
+                if self.adaptive is not None:
+                    keys.append(EvalCache.make_key(board, name, self.adaptive_key))
+                info = self._cache_get(keys)
+            if info is not None:
+                return completed_future(info), 'cache'
+
+        settled = None
+        if self.adaptive is not None:
+            settled = MarginSettled(result, *self.adaptive)
+        with self.stats.timer('submit'):
+            future = self.pool.submit(board, self.limit, settled)
+        if keys is not None:
+            future.add_done_callback(lambda future: self._cache_put(keys, future))
+        return future, 'engine'
+
+
+class LazyEvaluator:
+    """Builds an Evaluator with make() at the first flagged position.
+
+    Runs without flagged games then import neither python-chess nor the
+    tablebases, and start no engines.
+    """
+
+    def __init__(self, make, workers):
+        self.make = make
+        self.workers = workers
+        self.evaluator = None
+
+    def submit(self, board, result, offset=None):
+        if self.evaluator is None:
+            self.evaluator = self.make()
+        return self.evaluator.submit(board, result, offset)
+
+
+def completed_future(result):
+    from concurrent.futures import Future
+    future = Future()
+    future.set_result(result)
+    return future
+
+
+def movetext_key(raw):
+    """Returns a hash of the movetext of a raw game, ignoring its headers and line breaks."""
+    match = HEADER_END_RE.search(raw)
+    movetext = raw[match.end():] if match else raw
+    return hashlib.blake2b(b' '.join(movetext.split()), digest_size=16).digest()
+
+
+def select_games(games, evaluator, score_margin, stats=None, first_game_num=1, dedup=True):
+    """Selects games and yields a Decision for each of them, in input order.
+
+    games is an iterable of single games, given as PGN text (str or bytes) or
+    as the (offset, end_offset, raw, flagged) tuples of iter_raw_games.
+    Flagged positions go to evaluator, usually an Evaluator around a warm
+    EnginePool. While the engines think, up to four games per engine are read
+    ahead. With dedup, a flagged game whose movetext was seen before only has
+    its headers read; it shares the comments and evaluation of the first one.
+    Nothing is printed or written, which is up to the caller.
+    """
+    stats = stats or Stats()
+    seen_games = {}
+    pending = deque()
+    max_pending = 4 * evaluator.workers
+
+    def decide(request):
+        future = request.pop('future')
+        if future is None:
+            return Decision(verdict='good', info=None, source=None, **request)
+        if not future.done():
+            with stats.timer('engine_wait'):
+                future.result()
+        info = future.result()
+        score_wpov = info['score'].white().score(mate_score=32000) / 100
+        removed = is_game_removed(request['headers']['Result'], score_wpov, score_margin)
+        return Decision(verdict='bad' if removed else 'kept', info=info,
+                        source=request.pop('source'), **request)
+
+    try:
+        for game_num, item in enumerate(games, first_game_num):
+            if isinstance(item, tuple):
+                offset, end_offset, raw, flagged = item
+            else:
+                raw = item.encode() if isinstance(item, str) else item
+                offset = end_offset = None
+                flagged = TERMINATION_RE.search(raw) is not None
+            request = {'game_num': game_num, 'offset': offset, 'end_offset': end_offset,
+                       'raw': raw, 'headers': None, 'comments': None, 'comment': None,
+                       'fen': None, 'future': None}
+
+            # Most games end normally; only parse the moves of the others.
+            if flagged:
+                import chess.pgn
+            key = movetext_key(raw) if flagged and dedup else None
+            if key in seen_games:
+                stats.add('duplicate_games')
+                with stats.timer('parse'):
+                    request['headers'] = chess.pgn.read_headers(
+                        io.StringIO(raw.decode('utf-8', errors='replace')))
+                request.update(seen_games[key])
+                if request['future'] is not None:
+                    stats.add('flagged')
+                    request['source'] = 'duplicate'
+            elif flagged:
+                with stats.timer('parse'):
+                    game = chess.pgn.read_game(io.StringIO(raw.decode('utf-8', errors='replace')),
+                                               Visitor=flagged_game_visitor())
+                request['headers'] = game.headers
+                request['comments'] = game.comments
+                board = game.flagged_board
+                if board is not None:
+                    stats.add('flagged')
+                    with stats.timer('board'):
+                        request['comment'] = game.flagged_comment
+                        request['fen'] = board.fen()
+                    request['future'], request['source'] = evaluator.submit(
+                        board, game.headers['Result'], offset)
+                if key is not None:
+                    seen_games[key] = {name: request[name] for name in
+                                       ('comments', 'comment', 'fen', 'future')}
+
+            pending.append(request)
+            while pending and (pending[0]['future'] is None or pending[0]['future'].done()
+                               or len(pending) > max_pending):
+                yield decide(pending.popleft())
+
+        while pending:
+            yield decide(pending.popleft())
+    finally:
+        # Analyses that have not started yet are dropped when the caller stops early.
+        for request in pending:
+            if request['future'] is not None:
+                request['future'].cancel()
+
+
+def start_engine_pool(args):
+    """Starts the engine pool described by the command line arguments.
+
+    With --consensus-engine, this is a ConsensusPool over one pool per engine.
+    """
+    import chess.engine
+    pool_class = AsyncEnginePool if args.async_engines else EnginePool
+    pools = []
+    try:
+        for engine in [args.engine] + args.consensus_engine:
+            pool = pool_class(engine, args.workers, {'Threads': args.threads, 'Hash': args.hash})
+            print(f'engine: {pool.name}, workers: {pool.workers}, '
+                  f'threads: {pool.options.get("Threads", "default")}, '
+                  f'hash: {pool.options.get("Hash", "default")} MB')
+            pools.append(pool)
+    except BaseException:
+        for pool in pools:
+            pool.quit()
+        raise
+    if len(pools) == 1:
+        return pools[0]
+    escalate_time = args.escalate_time or 4 * args.move_time_sec
+    return ConsensusPool(pools, args.score_margin, chess.engine.Limit(time=escalate_time),
+                         args.escalate_band, args.escalate_budget)
+
+
+def file_fingerprint(fn, offset, span=64 * 1024):
+    """Hashes the first and the last span bytes before offset of fn.
+
+    Comparing fingerprints tells whether the part of a file that was already
+    processed is still the same, without reading all of it.
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    with open(fn, 'rb') as h:
+        digest.update(h.read(min(span, offset)))
+        h.seek(max(offset - span, 0))
+        digest.update(h.read(offset - h.tell()))
+    return digest.hexdigest()
+
+
+def complete_games_end(fn, index):
+    """Returns the end offset of the last complete game of fn.
+
+    A tournament manager may still be writing the last game. It counts as
+    complete once its movetext ends with the result of its Result tag.
+    """
+    if not len(index):
+        return 0
+    start, end = index.game_range(len(index) - 1)
+    with open(fn, 'rb') as h:
+        raw = index.read_game(h, len(index) - 1)
+    match = RESULT_TAG_RE.search(raw)
+    result = re.escape(match.group(1)) if match else rb'1-0|0-1|1/2-1/2|\*'
+    if re.search(rb'(?:^|[\s}])(?:' + result + rb')\s*$', raw):
+        return end
+    return start
+
+
+def load_incremental_state(path, fn, settings):
+    """Returns the checkpoint an --incremental run can continue from, or None."""
+    if not os.path.exists(path):
+        return None
+    with open(path) as f:
+        state = json.load(f)
+    if state['settings'] != settings:
+        print('the settings have changed, selecting all games again')
+        return None
+    offset = state['checkpoint']['offset']
+    if os.path.getsize(fn) < offset or file_fingerprint(fn, offset) != state['fingerprint']:
+        print(f'{fn} was rewritten, selecting all games again')
+        return None
+    return state['checkpoint']
+
+
+def save_incremental_state(path, fn, settings, checkpoint):
+    state = {'settings': settings, 'checkpoint': checkpoint,
+             'fingerprint': file_fingerprint(fn, checkpoint['offset'])}
+    with open(f'{path}.part', 'w') as f:
+        json.dump(state, f)
+    os.replace(f'{path}.part', path)
+
+
+def process_games(args, fn, start, end, outputs, journal=None, checkpoint=None,
+                  resumed_evals=None, show_progress=True, pool=None,
+                  progress=None, cancel=None, first_game_num=1, memo=None):
+    """Selects the games between the byte offsets start and end of fn.
+
+    start and end must be game boundaries. outputs maps 'good', 'bad', 'kept'
+    and 'players' to the files the games and the bad game report are written
+    to. With a journal, progress is checkpointed, and a checkpoint from an
+    interrupted run is continued. The summary includes the checkpoint of the
+    end state, which --incremental continues from later. An already running
+    pool is used instead of starting new engines, and a memo of evaluated
+    positions can be shared between runs. Games are numbered from first_game_num.
+
+    progress, if given, is called a few times a second with a dict of the
+    bytes and games done so far. Setting the cancel event stops the run after
+    the game being written; the outputs so far are kept and, with a journal,
+    the run can be resumed. Returns a summary of the games processed.
+    """
+    cnt_written = 0
+    bad_cnt = 0
+    early_stops = 0
+    player_totals = defaultdict(int)
+    stats = Stats()
+    run_start = last_live = last_progress = time.monotonic()
+    cancelled = False
+
+    own_pool = pool is None
+    if own_pool:
+        pool = LazyEnginePool(lambda: start_engine_pool(args), args.workers,
+                              [args.engine] + args.consensus_engine)
+
+    # The engines, cache and tablebases are released also when an engine fails.
+    cache = adjudicator = None
+    try:
+        if args.cache:
+            cache = EvalCache(args.cache, args.cache_size)
+        adaptive = None
+        if args.adaptive:
+            adaptive = (args.score_margin, args.adaptive_band, args.adaptive_depths)
+
+        def make_evaluator():
+            import chess.engine
+            nonlocal adjudicator
+            if args.pre_adjudication:
+                adjudicator = StaticAdjudicator(args.syzygy)
+            return Evaluator(pool, chess.engine.Limit(time=args.move_time_sec), cache, adaptive,
+                             resumed_evals, adjudicator, args.dedup, memo, stats)
+
+        evaluator = LazyEvaluator(make_evaluator, pool.workers)
+
+        good_writer = OutputWriter(outputs['good'], append=True, flush_interval=args.flush_interval)
+        bad_writer = OutputWriter(outputs['bad'], append=True, flush_interval=args.flush_interval)
+        kept_writer = OutputWriter(outputs['kept'], flush_interval=args.flush_interval)
+        players_writer = OutputWriter(outputs['players'], flush_interval=args.flush_interval)
+        records_writer = OutputWriter(outputs['records'], flush_interval=args.flush_interval)
+        records_csv = outputs['records'].endswith('.csv')
+        writers = (good_writer, bad_writer, kept_writer, players_writer, records_writer)
+
+        def checkpoint_state(offset):
+            for writer in writers:
+                writer.flush(sync=True)
+            return {
+                'offset': offset, 'games': cnt_written, 'bad': bad_cnt, 'early_stops': early_stops,
+                'player_totals': player_totals,
+                'outputs': {writer.path: writer.tell() for writer in writers},
+            }
+
+        def save_checkpoint(offset):
+            journal.checkpoint(checkpoint_state(offset))
+
+        if checkpoint is not None:
+            start = checkpoint['offset']
+            cnt_written = checkpoint['games']
+            bad_cnt = checkpoint['bad']
+            early_stops = checkpoint['early_stops']
+            player_totals.update(checkpoint['player_totals'])
+            for writer in writers:
+                writer.resume(checkpoint['outputs'][writer.path])
+            print(f'continuing after game {cnt_written}')
+        else:
+            records_writer.write(format_records([], records_csv, header=True))
+            if journal is not None:
+                save_checkpoint(start)
+        last_checkpoint = time.monotonic()
+        done_offset = start
+
+        def report_progress():
+            progress({'bytes_done': done_offset - start, 'bytes_total': end - start,
+                      'games': cnt_written, 'bad': bad_cnt, 'flagged': stats.counts['flagged'],
+                      'engine_calls': stats.counts['engine_calls'],
+                      'cache_hits': cache.hits if cache is not None else 0,
+                      'elapsed': time.monotonic() - run_start})
+
+        with open(fn, 'rb') as h:
+            h.seek(start)
+            games = stats.timed('scan', iter_raw_games(h, start=start, end=end))
+
+            decisions = select_games(games, evaluator, args.score_margin, stats,
+                                     first_game_num + cnt_written, args.dedup)
+            for decision in decisions:
+                if show_progress:
+                    print_progress(decision.offset, end, prefix='Processing games')
+                if args.stats_interval and time.monotonic() - last_live >= args.stats_interval:
+                    last_live = time.monotonic()
+                    print(f'\n{stats.live_line(last_live - run_start)}')
+
+                info = decision.info
+                if decision.source == 'engine':
+                    if journal is not None:
+                        journal.record_eval(decision.offset, info)
+                    stats.add('engine_calls')
+                    stats.add('nodes', info.get('nodes', 0))
+                    stats.engine_time += info['analysis_time']
+                if info is not None and info.get('stopped_early'):
+                    early_stops += 1
+                if info is not None and info.get('escalated') and decision.source == 'engine':
+                    stats.add('escalations')
+                if decision.source == 'static':
+                    stats.add('static_adjudications')
+                elif decision.source in ('memo', 'duplicate'):
+                    stats.add('memo_hits' if decision.source == 'memo' else 'duplicate_evals')
+                    stats.engine_saved += info.get('analysis_time', 0)
+
+                with stats.timer('write'):
+                    if decision.verdict != 'good':
+                        print_decision(decision)
+                    if decision.verdict != 'bad':
+                        good_writer.write_game(decision.raw)
+                    if decision.verdict == 'kept':
+                        kept_writer.write_game(decision.raw)
+                    elif decision.verdict == 'bad':
+                        bad_cnt += 1
+                        bad_writer.write_game(decision.raw)
+                        report_lines = report_bad_game(decision.headers, decision.comments,
+                                                       player_totals)
+                        players_writer.write(("\n".join(report_lines) + "\n\n").encode())
+                        records_writer.write(format_records(
+                            [bad_game_record(decision)], records_csv))
+
+                cnt_written += 1
+                stats.add('games')
+                done_offset = decision.end_offset
+                if journal is not None and time.monotonic() - last_checkpoint >= args.flush_interval:
+                    save_checkpoint(done_offset)
+                    last_checkpoint = time.monotonic()
+                if progress is not None and time.monotonic() - last_progress >= 0.25:
+                    last_progress = time.monotonic()
+                    report_progress()
+                if cancel is not None and cancel.is_set():
+                    cancelled = True
+                    break
+            decisions.close()
+
+        if cancelled and journal is not None:
+            save_checkpoint(done_offset)
+        if progress is not None:
+            report_progress()
+        summary = {'games': cnt_written, 'bad': bad_cnt, 'early_stops': early_stops,
+                   'player_totals': dict(player_totals), 'cache_hits': 0, 'cache_misses': 0,
+                   'cancelled': cancelled}
+        if cache is not None:
+            summary['cache_hits'] = cache.hits
+            summary['cache_misses'] = cache.misses
+        for name in ('bad', 'early_stops', 'cache_hits', 'cache_misses'):
+            stats.add(name, summary[name])
+
+        # The kept games file is always created, even when it stays empty.
+        with stats.timer('write'):
+            kept_writer.write(b'')
+            summary['checkpoint'] = checkpoint_state(done_offset)
+            for writer in writers:
+                writer.close()
+        summary['stats'] = stats.state()
+    finally:
+        if own_pool:
+            pool.quit()
+        if adjudicator is not None:
+            adjudicator.close()
+        if cache is not None:
+            cache.close()
+
+    return summary
+
+
+def plan_shards(index, shards):
+    """Splits the games of index into at most `shards` byte ranges of similar size.
+
+    Returns (start, end, first game number) for each range.
+    """
+    size = index.offsets[len(index)]
+    bounds = [0]
+    for i in range(1, shards):
+        n = bisect.bisect_left(index.offsets, size * i // shards, 0, len(index))
+        if index.offsets[n] > bounds[-1]:
+            bounds.append(index.offsets[n])
+    bounds.append(size)
+    return [(start, end, index.game_at(start)) for start, end in zip(bounds, bounds[1:])
+            if end > start]
+
+
+def process_shards(args, fn, outputs, index):
+    """Processes byte-range shards of fn in parallel processes and merges their outputs.
+
+    Every shard has its own engine pool and writes to its own files under
+    output/shards. The files are concatenated in shard order afterwards, so
+    the outputs are the same as those of a single process run.
+    """
+    import colorama
+    from concurrent.futures import ProcessPoolExecutor
+    shard_dir = os.path.join('output', 'shards')
+    ranges = plan_shards(index, args.shards)
+    if not ranges:
+        # An empty input has nothing to split, nor any game to start processes or engines for.
+        return process_games(args, fn, 0, 0, outputs, show_progress=False)
+    shard_outputs = [{name: os.path.join(shard_dir, str(i), os.path.basename(path))
+                      for name, path in outputs.items()} for i in range(len(ranges))]
+    for shard in shard_outputs:
+        os.makedirs(os.path.dirname(shard['good']), exist_ok=True)
+    print(f'processing {len(ranges)} shards')
+
+    with ProcessPoolExecutor(max_workers=len(ranges), initializer=colorama.init,
+                             initargs=(True,)) as executor:
+        futures = [executor.submit(process_games, args, fn, start, end, shard,
+                                   first_game_num=first_game + 1, show_progress=False)
+                   for (start, end, first_game), shard in zip(ranges, shard_outputs)]
+        summaries = [future.result() for future in futures]
+
+    summary = {'games': 0, 'bad': 0, 'early_stops': 0, 'player_totals': defaultdict(int),
+               'cache_hits': 0, 'cache_misses': 0, 'cancelled': False}
+    stats = Stats()
+    for shard_summary in summaries:
+        for name, value in shard_summary.items():
+            if name == 'player_totals':
+                for player, total in value.items():
+                    summary['player_totals'][player] += total
+            elif name == 'stats':
+                stats.merge(value)
+            elif name == 'cancelled':
+                summary[name] = summary[name] or value
+            elif name == 'checkpoint':
+                continue
+            else:
+                summary[name] += value
+    summary['stats'] = stats.state()
+
+    for name, path in outputs.items():
+        writer = OutputWriter(path, append=name in ('good', 'bad'))
+        for i, shard in enumerate(shard_outputs):
+            if os.path.exists(shard[name]):
+                with open(shard[name], 'rb') as f:
+                    if i and name == 'records' and path.endswith('.csv'):
+                        f.readline()
+                    while block := f.read(1024 * 1024):
+                        writer.write(block)
+        writer.close()
+    shutil.rmtree(shard_dir)
+    return summary
+
+
+def build_parser():
     parser = argparse.ArgumentParser(
         prog=__script_name__,
         description=__goal__, epilog='%(prog)s')
     parser.add_argument('--input', required=True, type=str,
-                        help='Input pgn filename (required=True).')
+                        help='Input pgn filename, or folders and glob patterns of several pgn '
+                             'files separated by the path separator (required=True).')
     parser.add_argument('--output-good', required=True, type=str,
                         help='Output filename for good games, append mode (required=True).')
     parser.add_argument('--output-bad', required=True, type=str,
                         help='Output filename for bad games, append mode (required=True).')
     parser.add_argument('--engine', required=True, type=str,
                         help='engine filename (required=True).')
-    parser.add_argument('--hash', required=False, type=int, default=128,
-                        help='engine hash size (required=False, default=128).')
-    parser.add_argument('--threads', required=False, type=int, default=1,
-                        help='engine threads to use (required=False, default=1).')
-    parser.add_argument('--move-time-sec', required=False, type=int, default=1,
-                        help='movetime in seconds (required=False, default=1).')
+    parser.add_argument('--hash', required=False, type=auto_int, default=128,
+                        help='engine hash size in MB per engine, or auto (required=False, default=128).')
+    parser.add_argument('--threads', required=False, type=auto_int, default=1,
+                        help='engine threads to use per engine, or auto (required=False, default=1).')
+    parser.add_argument('--move-time-sec', required=False, type=seconds, default=1,
+                        help='movetime in seconds, e.g. 0.5 (required=False, default=1).')
     parser.add_argument('--score-margin', required=False, type=float, default=5.0,
                         help='score margin in pawn unit (required=False, default=5.0).')
+    parser.add_argument('--workers', required=False, type=auto_int, default=1,
+                        help='number of engine processes analysing positions in parallel, '
+                             'or auto (required=False, default=1).')
+    parser.add_argument('--async-engines', action='store_true',
+                        help='drive the engines from one asyncio event loop instead of a '
+                             'thread per engine (required=False).')
+    parser.add_argument('--consensus-engine', required=False, action='append', default=[],
+                        help='another engine that evaluates every flagged position together '
+                             'with --engine, the median score deciding; can be given more '
+                             'than once (required=False).')
+    parser.add_argument('--escalate-time', required=False, type=float, default=None,
+                        help='seconds of the second search when the consensus engines disagree '
+                             'or a score is near the margin (required=False, '
+                             'default=4 x move-time-sec).')
+    parser.add_argument('--escalate-band', required=False, type=float, default=1.0,
+                        help='distance in pawn unit from 0 and the score margin within which '
+                             'a consensus score is escalated (required=False, default=1.0).')
+    parser.add_argument('--escalate-budget', required=False, type=float, default=None,
+                        help='total engine seconds all escalations together may use '
+                             '(required=False, default=no limit).')
+    parser.add_argument('--syzygy', required=False, type=str, default=None,
+                        help='Syzygy tablebase directories, separated by the path separator, '
+                             'probed before the engine is asked (required=False).')
+    parser.add_argument('--no-pre-adjudication', dest='pre_adjudication', action='store_false',
+                        help='send every flagged position to the engine, also checkmates, '
+                             'dead draws and bare kings (required=False).')
+    parser.add_argument('--no-dedup', dest='dedup', action='store_false',
+                        help='evaluate every flagged game and position, also ones that were '
+                             'seen before in the same run (required=False).')
+    parser.add_argument('--shards', required=False, type=int, default=1,
+                        help='number of processes that each select the games of one part of '
+                             'the input with their own engines (required=False, default=1).')
+    parser.add_argument('--adaptive', action='store_true',
+                        help='stop the search early once the score is clearly on one side of '
+                             'the score margin (required=False).')
+    parser.add_argument('--adaptive-band', required=False, type=float, default=1.0,
+                        help='distance in pawn unit the score must keep from the score margin '
+                             'for an early stop (required=False, default=1.0).')
+    parser.add_argument('--adaptive-depths', required=False, type=int, default=3,
+                        help='number of consecutive depths the verdict must hold for an early '
+                             'stop (required=False, default=3).')
+    parser.add_argument('--cache', required=False, type=str, nargs='?', const='eval_cache.sqlite',
+                        help='file of the persistent evaluation cache, '
+                             'eval_cache.sqlite if no file is given (required=False).')
+    parser.add_argument('--cache-size', required=False, type=int, default=1000000,
+                        help='maximum number of cached evaluations (required=False, default=1000000).')
+    parser.add_argument('--records', required=False, default=os.path.join('output', 'bad_games.csv'),
+                        help='file of the bad game records, CSV or JSON lines by extension; '
+                             'engine totals are written next to it '
+                             '(required=False, default=output/bad_games.csv).')
+    parser.add_argument('--resume', action='store_true',
+                        help='continue an interrupted run from its last checkpoint (required=False).')
+    parser.add_argument('--incremental', action='store_true',
+                        help='only select the games appended to the input since the last '
+                             'incremental run and add them to the outputs (required=False).')
+    parser.add_argument('--watch', required=False, type=float, default=0,
+                        help='keep running incrementally, checking the input for new games '
+                             'every this many seconds, 0 for no watching '
+                             '(required=False, default=0).')
+    parser.add_argument('--flush-interval', required=False, type=float, default=10.0,
+                        help='seconds between flushes of the output files to disk '
+                             'and resume checkpoints (required=False, default=10.0).')
+    parser.add_argument('--stats', required=False, type=str, nargs='?', const=os.path.join('output', 'stats.json'),
+                        help='write stage timings, engine and cache statistics as JSON to this file, '
+                             'output/stats.json if no file is given (required=False).')
+    parser.add_argument('--stats-interval', required=False, type=float, default=0,
+                        help='seconds between live statistics lines, 0 for none '
+                             '(required=False, default=0).')
     parser.add_argument('-v', '--version', action='version',
                         version=f'{__version__}')                        
+    return parser
 
-    args = parser.parse_args()
-    output_goodfn = args.output_good
-    output_badfn = args.output_bad
+
+def parse_args(argv=None):
+    """Parses and checks the command line, with the auto resources planned.
+
+    argv defaults to sys.argv. Invalid arguments exit through argparse.
+    """
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    for name in ('workers', 'threads', 'hash'):
+        value = getattr(args, name)
+        if value is not None and value < 1:
+            parser.error(f'--{name} must be at least 1 or auto')
+    if args.shards < 1:
+        parser.error('--shards must be at least 1')
+    if args.shards > 1 and args.resume:
+        parser.error('--resume can not be used with --shards')
+    if args.watch:
+        args.incremental = True
+    if args.incremental and (args.resume or args.shards > 1):
+        parser.error('--incremental and --watch can not be used with --resume or --shards')
+    args.inputs = expand_inputs(args.input)
+    if not args.inputs:
+        parser.error(f'no pgn files found for --input {args.input}')
+    args.batch = not os.path.isfile(args.input)
+    if args.batch and (args.resume or args.watch or args.shards > 1):
+        parser.error('several inputs can not be used with --resume, --watch or --shards')
+    if args.syzygy:
+        for directory in args.syzygy.split(os.pathsep):
+            if not os.path.isdir(directory):
+                parser.error(f'no syzygy tablebase directory {directory}')
+    pools = args.shards * (1 + len(args.consensus_engine))
+    args.workers, args.threads, args.hash = plan_engine_resources(args.workers, args.threads,
+                                                                  args.hash, pools)
+    return args
+
+
+def run(args, progress=None, cancel=None, pool=None, folder='output', memo=None):
+    """Runs a selection for parse_args arguments and returns its summary.
+
+    Without a progress callback a progress bar is printed instead. See
+    process_games for progress, cancel, pool and memo; a cancelled run keeps
+    its journal so that it can be resumed. The reports, journal and state go
+    to folder. Raises ResumeError if --resume is not possible.
+    """
     fn = args.input
-    movetimesec = args.move_time_sec
-    score_margin = args.score_margin
-    enginefn = args.engine
-    cnt = 0
-    not_removed_games = []
+    outputs = {
+        'good': args.output_good,
+        'bad': args.output_bad,
+        'kept': os.path.join(folder, 'kept games_(score_margin_reached).pgn'),
+        'players': os.path.join(folder, 'players_bad_games.txt'),
+        'records': args.records,
+    }
+    total_bytes = os.path.getsize(fn)
+
+    journal = Journal(os.path.join(folder, 'selector_journal.jsonl'))
+    run_header = {
+        'input': os.path.abspath(fn), 'size': total_bytes, 'mtime': os.path.getmtime(fn),
+        'engine': args.engine, 'move_time_sec': args.move_time_sec, 'score_margin': args.score_margin,
+        'adaptive': args.adaptive, 'output_good': args.output_good, 'output_bad': args.output_bad,
+        'records': args.records, 'consensus_engines': args.consensus_engine,
+        'escalate_time': args.escalate_time, 'escalate_band': args.escalate_band,
+        'pre_adjudication': args.pre_adjudication, 'syzygy': args.syzygy,
+    }
+    checkpoint = None
+    resumed_evals = {}
+    state_path = os.path.join(folder, 'selector_state.json')
+    settings = {name: value for name, value in run_header.items() if name not in ('size', 'mtime')}
+    if args.resume:
+        if not os.path.exists(journal.path):
+            raise ResumeError('there is no interrupted run to resume')
+        header, checkpoint, resumed_evals = journal.load()
+        changed = [name for name, value in run_header.items() if header.get(name) != value]
+        if changed:
+            raise ResumeError(f'cannot resume, the run was started with a different {", ".join(changed)}')
+    elif args.incremental:
+        checkpoint = load_incremental_state(state_path, fn, settings)
+        if checkpoint is None:
+            delete_output_files(folder)
+    else:
+        delete_output_files(folder)
+
+    run_start = time.monotonic()
+    # Shards and --incremental need the index. A plain run reads the pgn only
+    # once and counts its games only when an index was saved before.
+    if args.shards > 1 or args.incremental:
+        index = PgnIndex.open(fn)
+    else:
+        index = PgnIndex.saved(fn)
+    games_total = len(index) if index is not None else None
+    if games_total is not None:
+        print(f'{games_total} games in {fn}')
+
+    def report_progress(state):
+        progress(dict(state, games_total=games_total))
+
+    if args.shards > 1:
+        summary = process_shards(args, fn, outputs, index)
+    elif args.incremental:
+        # Only complete games are selected; the rest is picked up by the next run.
+        end = complete_games_end(fn, index)
+        summary = process_games(args, fn, 0, end, outputs, None, checkpoint,
+                                show_progress=progress is None, pool=pool,
+                                progress=progress and report_progress, cancel=cancel, memo=memo)
+        save_incremental_state(state_path, fn, settings, summary['checkpoint'])
+    else:
+        if checkpoint is None:
+            journal.start(run_header)
+        summary = process_games(args, fn, 0, total_bytes, outputs, journal, checkpoint,
+                                resumed_evals, show_progress=progress is None, pool=pool,
+                                progress=progress and report_progress, cancel=cancel, memo=memo)
+        if not summary['cancelled']:
+            journal.remove()
+    if index is not None:
+        index.close()
+
+    if args.adaptive:
+        print(f'\nadaptive search stopped early {summary["early_stops"]} times')
+    run_stats = Stats()
+    run_stats.merge(summary['stats'])
+    if args.consensus_engine:
+        print(f'\nconsensus escalated {run_stats.counts["escalations"]} positions')
+    if args.pre_adjudication:
+        print(f'\n{run_stats.counts["static_adjudications"]} positions adjudicated without engine')
+    if args.dedup:
+        print(f'\ndedup: {run_stats.counts["duplicate_games"]} duplicate flagged games, '
+              f'{run_stats.counts["memo_hits"]} repeated positions, '
+              f'{run_stats.engine_saved:.1f} engine seconds saved')
+    if args.cache:
+        print(f'\nevaluation cache: {summary["cache_hits"]} hits, {summary["cache_misses"]} misses')
+
+    if args.stats:
+        report = run_stats.summary(time.monotonic() - run_start)
+        report['settings'] = {
+            'workers': args.workers, 'threads': args.threads, 'hash': args.hash,
+            'shards': args.shards, 'async_engines': args.async_engines,
+            'move_time_sec': args.move_time_sec, 'adaptive': args.adaptive,
+            'input_bytes': total_bytes,
+        }
+        with open(args.stats, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f'\n{run_stats.live_line(report["elapsed_sec"])}')
+
+    if summary['bad']:
+        with open(os.path.join(folder, 'player_totals_bad_games.txt'), 'w') as totals_file:
+            for player, total in summary['player_totals'].items():
+                totals_file.write(f"\n{player} = {total}\n")
+        # An earlier --incremental run may have found no bad games yet.
+        no_bad_games_path = os.path.join(folder, 'no_bad_games_found.txt')
+        if os.path.exists(no_bad_games_path):
+            os.remove(no_bad_games_path)
+    totals_path = os.path.join(os.path.dirname(args.records),
+                               'engine_totals' + os.path.splitext(args.records)[1])
+    write_engine_totals(totals_path, engine_totals(read_records(args.records)))
+
+    if not summary['bad'] and not summary['cancelled']:
+        create_no_bad_games_file(folder)
+    return summary
+
+
+def expand_inputs(pattern):
+    """Returns the pgn files an --input names, without duplicates.
+
+    pattern is a pgn file, a folder, for all its .pgn files, or a glob
+    pattern. Several of them can be given, separated by the path separator.
+    """
+    files = []
+    for part in filter(None, pattern.split(os.pathsep)):
+        if os.path.isdir(part):
+            files.extend(sorted(glob.glob(os.path.join(part, '*.pgn'))))
+        elif glob.has_magic(part):
+            files.extend(sorted(glob.glob(part, recursive=True)))
+        elif os.path.isfile(part):
+            files.append(part)
+    return list(dict.fromkeys(path for path in files if os.path.isfile(path)))
+
+
+def batch_folders(files):
+    """Returns an output folder per input file, named after the file."""
+    folders = {}
+    for fn in files:
+        name = os.path.splitext(os.path.basename(fn))[0]
+        folder = os.path.join('output', name)
+        n = 1
+        while folder in folders.values():
+            n += 1
+            folder = os.path.join('output', f'{name}_{n}')
+        folders[fn] = folder
+    return folders
+
 
+def run_batch(args, progress=None, cancel=None):
+    """Runs the selection on every file of args.inputs with one warm engine pool.
+
+    The largest files go first. Each file gets its own outputs in a folder
+    under output named after it, and unless --no-dedup is given the evaluated
+    positions are shared between files. The bad games of all files are totalled per engine
+    in output/engine_totals, next to output/batch_summary.csv with a row per
+    file. progress states also tell the file being processed. Returns the
+    totals of all files with the summary of each under 'files'.
+    """
+    files = sorted(args.inputs, key=os.path.getsize, reverse=True)
+    folders = batch_folders(files)
     delete_output_files()
+    print(f'{len(files)} pgn files to process')
 
-    engine = chess.engine.SimpleEngine.popen_uci(enginefn)
-    
-    report_data = {
-        'wins_on_time': {'White': 0, 'Black': 0},
-        'illegal_moves': {'White': 0, 'Black': 0},
-        'crashed_games': {'White': 0, 'Black': 0},
-        'drawn_in_winning_position': {'White': 0, 'Black': 0},
-        'false illegal move claim': {'White': 0, 'Black': 0},
-        'false draw claim': {'White': 0, 'Black': 0}   
-    }
+    memo = {} if args.dedup else None
+    totals = {'games': 0, 'bad': 0, 'cancelled': False, 'files': {}}
+    pool = LazyEnginePool(lambda: start_engine_pool(args), args.workers,
+                          [args.engine] + args.consensus_engine)
+    try:
+        for n, fn in enumerate(files, 1):
+            if cancel is not None and cancel.is_set():
+                totals['cancelled'] = True
+                break
+            folder = folders[fn]
+            os.makedirs(folder, exist_ok=True)
+            file_args = copy.copy(args)
+            file_args.input = fn
+            for name in ('output_good', 'output_bad', 'records', 'stats'):
+                path = getattr(args, name)
+                if path:
+                    setattr(file_args, name, os.path.join(folder, os.path.basename(path)))
 
-    with open(fn) as h:
-        total_games = sum(1 for line in h if 'White' in line)
-        h.seek(0)
-        
-        while True:
-            game = chess.pgn.read_game(h)
-                     
-            if game is None:
+            def file_progress(state, fn=fn, n=n):
+                progress(dict(state, file=fn, file_num=n, files=len(files)))
+
+            print(f'\n[{n}/{len(files)}] {fn}')
+            summary = run(file_args, progress and file_progress, cancel, pool, folder, memo)
+            totals['files'][fn] = summary
+            totals['games'] += summary['games']
+            totals['bad'] += summary['bad']
+            if summary['cancelled']:
+                totals['cancelled'] = True
                 break
-            
-            print_progress(cnt, total_games, prefix='Processing games')  
-           
-            cnt += 1
-            
-            result = game.headers['Result']
-            is_bad = False
-            is_save = True
-            
-            for node in game.mainline():
-                parent_node = node.parent
-                comment = node.comment                
-
-                if any(keyword in comment for keyword in [
-                    'but bare king} 1/2-1/2', 
-                    'forfeits on time', 
-                    'Arena Adjudication. Illegal move!', 
-                    'polyglot: resign (illegal engine move', 
-                    'Forfeit due to invalid move', 
-                    'wins on time', 
-                    'False illegal-move claim',
-                    'exited unexpectedly',
-                    'False draw claim:']):
-                    is_bad = True
-
-                if is_bad:
-                    fen = node.board().fen()
-                    print(f' ')
-                    print(f'\ngame_num: {cnt}, result: {result}, comment: {comment}')
-                    print(f'fen: {fen}')
-                    print(f' ')
-
-                    board = chess.Board(fen)
-                    info = engine.analyse(board, chess.engine.Limit(time=movetimesec))
-                    score_wpov = info['score'].white().score(mate_score=32000)
-                    score_wpov /= 100                   
-
-                    if (result == '0-1' and score_wpov > -score_margin) or \
-                       (result == '1/2-1/2' and score_wpov > 0 and score_wpov > -score_margin) or \
-                       (result == '1-0' and score_wpov < score_margin) or \
-                       (result == '1/2-1/2' and score_wpov > 0 and score_wpov < score_margin):
-                        print(f'{colorama.Fore.RED}{colorama.Style.BRIGHT}will not keep this game, eval: {score_wpov} wpov{colorama.Style.RESET_ALL}')
-                        print(f'\n ')
-                        is_save = False
-                      
-                    else:
-                        print(f'{colorama.Fore.YELLOW}{colorama.Style.BRIGHT}this game will be kept, eval: {score_wpov} wpov{colorama.Style.RESET_ALL}')
-                        not_removed_games.append(str(game))
-                        print(f' ')
-                        is_save = True
-                        
-                    break
-                    
-            if is_save:
-                with open(output_goodfn, 'a') as f:
-                    f.write(f'{game}\n\n')
-            else:
-                with open(output_badfn, 'a') as f:
-                    f.write(f'{game}\n\n')                
-
-    engine.quit()
-    
-    with open('kept games_(score_margin_reached).pgn', 'w') as f:
-        for game in not_removed_games:
-            f.write(f'{game}\n\n')
-
-
-    os.rename('kept games_(score_margin_reached).pgn', os.path.join('output', 'kept games_(score_margin_reached).pgn'))
-
-    print_progress(cnt, total_games, prefix='Processing games')  
-    
-    if os.path.exists(os.path.join('output', 'bad.pgn')):
-        with open(os.path.join('output', 'bad.pgn'), 'r') as bad_pgn_file:
-            player_totals = defaultdict(int)
-            while True:
-                bad_game = chess.pgn.read_game(bad_pgn_file)
-                if bad_game is None:
-                    break
-                    
-                white_engine_name = bad_game.headers['White']
-                black_engine_name = bad_game.headers['Black']
-                result = bad_game.headers['Result']
-            
-                for node in bad_game.mainline():
-                    comment = node.comment                
-                    if 'wins on time' in comment:
-                        report_data['wins_on_time']['White' if result == '0-1' else 'Black'] += 1
-                    elif any(keyword in comment for keyword in [
-                        'Arena Adjudication. Illegal move!', 
-                        'polyglot: resign (illegal engine move', 
-                        'Forfeit due to invalid move']):
-                        report_data['illegal_moves']['White' if result == '0-1' else 'Black'] += 1
-                    elif 'exited unexpectedly' in comment:
-                        report_data['crashed_games']['White' if result == '0-1' else 'Black'] += 1
-                    elif 'but bare king} 1/2-1/2' in comment:
-                        report_data['drawn_in_winning_position']['White' if result == '1/2-1/2' else 'Black'] += 1
-                    elif 'False illegal-move claim' in comment:
-                        report_data['false illegal move claim']['White' if result == '0-1' else 'Black'] += 1
-                    elif  'False draw claim:' in comment:
-                        report_data['false draw claim']['White' if result == '0-1' else 'Black'] += 1
-                   
-                
-                report_lines = []
-                if result == '0-1' or result == '1-0' or result == '1/2-1/2' :
-                    report_lines.append(f"White: {white_engine_name}")
-                    report_lines.append(f"Black: {black_engine_name}")
-                if report_data['wins_on_time']['White'] > 0:
-                    report_lines.append(f"game lost on time [White]")
-                    report_data['wins_on_time']['White'] = 0
-                    player_totals[f"{white_engine_name}_total_bad_games"] += 1
-                
-                elif report_data['wins_on_time']['Black'] > 0:
-                    report_lines.append(f"game lost on time [Black]")
-                    report_data['wins_on_time']['Black'] = 0
-                    player_totals[f"{black_engine_name}_total_bad_games"] += 1
-               
-                elif report_data['crashed_games']['White'] > 0:
-                    report_lines.append(f"game lost by crash [White]")
-                    report_data['crashed_games']['White'] = 0            
-                    player_totals[f"{white_engine_name}_total_bad_games"] += 1
-                           
-                elif report_data['crashed_games']['Black'] > 0:
-                    report_lines.append(f"game lost by crash [Black]")
-                    report_data['crashed_games']['Black'] = 0            
-                    player_totals[f"{black_engine_name}_total_bad_games"] += 1             
-                
-                elif report_data['illegal_moves']['White'] > 0:
-                    report_lines.append(f"game lost by illegal move [White]")                             
-                    report_data['illegal_moves']['White'] = 0 
-                    player_totals[f"{white_engine_name}_total_bad_games"] += 1
-                
-                elif report_data['illegal_moves']['Black'] > 0:
-                    report_lines.append(f"game lost by illegal move [Black]")
-                    report_data['illegal_moves']['Black'] = 0
-                    player_totals[f"{black_engine_name}_total_bad_games"] += 1
-                        
-                elif report_data['drawn_in_winning_position']['White'] > 0:
-                    report_lines.append(f"game drawn in winning position [White]")
-                    report_data['drawn_in_winning_position']['White'] = 0
-                    player_totals[f"{white_engine_name}_total_bad_games"] += 1
-                            
-                elif report_data['drawn_in_winning_position']['Black'] > 0:
-                    report_lines.append(f"game drawn in winning position [Black]")                  
-                    report_data['drawn_in_winning_position']['Black'] = 0
-                    player_totals[f"{black_engine_name}_total_bad_games"] += 1
-                    
-                elif report_data['false illegal move claim']['White'] > 0:
-                    report_lines.append(f"false illegal move claim [White]")
-                    report_data['false illegal move claim']['White'] = 0
-                    player_totals[f"{white_engine_name}_total_bad_games"] += 1
-                    
-                elif report_data['false illegal move claim']['Black'] > 0:
-                    report_lines.append(f"false illegal move claim [Black]")
-                    report_data['false illegal move claim']['Black'] = 0
-                    player_totals[f"{black_engine_name}_total_bad_games"] += 1
-                            
-                elif report_data['false draw claim']['White'] > 0:
-                    report_lines.append(f"false draw claim [White]")                  
-                    report_data['false draw claim']['White'] = 0
-                    player_totals[f"{white_engine_name}_total_bad_games"] += 1
-                    
-                elif report_data['false draw claim']['Black'] > 0:
-                    report_lines.append(f"false draw claim [Black]")                  
-                    report_data['false draw claim']['Black'] = 0
-                    player_totals[f"{black_engine_name}_total_bad_games"] += 1
-                    
-                    
-                with open(os.path.join('output', 'players_bad_games.txt'), 'a') as players_file:
-                    players_file.write("\n".join(report_lines) + "\n\n")
-
-            with open(os.path.join('output', 'player_totals_bad_games.txt'), 'w') as totals_file:
-                for player, total in player_totals.items():
-                    totals_file.write(f"\n{player} = {total}\n")
-
-    print_progress(total_games, total_games, prefix='Processing games')  
-    
-    if cnt == total_games and not os.path.exists(os.path.join('output', 'bad.pgn')):
-        create_no_bad_games_file()
+    finally:
+        pool.quit()
+
+    records = []
+    with open(os.path.join('output', 'batch_summary.csv'), 'w', newline='') as f:
+        writer = csv.writer(f, lineterminator='\n')
+        writer.writerow(['input', 'folder', 'games', 'bad', 'flagged', 'engine_calls', 'cancelled'])
+        for fn, summary in totals['files'].items():
+            counts = summary['stats']['counts']
+            writer.writerow([fn, folders[fn], summary['games'], summary['bad'],
+                             counts.get('flagged', 0), counts.get('engine_calls', 0),
+                             summary['cancelled']])
+            records_path = os.path.join(folders[fn], os.path.basename(args.records))
+            if os.path.exists(records_path):
+                records.extend(read_records(records_path))
+    write_engine_totals(os.path.join('output', 'engine_totals' + os.path.splitext(args.records)[1]),
+                        engine_totals(records))
+    print(f'\n{len(totals["files"])} files, {totals["games"]} games, {totals["bad"]} bad games')
+    return totals
+
+
+def watch(args):
+    """Selects the new games of a growing input until interrupted with Ctrl+C."""
+    def input_state():
+        st = os.stat(args.input)
+        return st.st_size, st.st_mtime_ns
+
+    pool = LazyEnginePool(lambda: start_engine_pool(args), args.workers,
+                          [args.engine] + args.consensus_engine)
+    try:
+        while True:
+            seen = input_state()
+            run(args, pool=pool)
+            print(f'\nwaiting for new games in {args.input}, press Ctrl+C to stop')
+            while input_state() == seen:
+                time.sleep(args.watch)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        pool.quit()
+
+
+def main():
+    args = parse_args()
+    import colorama
+    colorama.init(autoreset=True)
+    if sys.stdout.isatty():
+        # Clear the screen without starting a shell.
+        print('\033[2J\033[H', end='', flush=True)
+
+    if args.watch:
+        watch(args)
+        return
+
+    if args.batch:
+        run_batch(args)
+    else:
+        try:
+            run(args)
+        except ResumeError as e:
+            build_parser().error(str(e))
+
+        total_bytes = os.path.getsize(args.input)
+        print_progress(total_bytes, total_bytes, prefix='Processing games')
 
     open_output_folder()
 
     print(f'\n ')
 
-
 if __name__ == '__main__':
     main()
 
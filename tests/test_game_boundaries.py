@@ -0,0 +1,50 @@
+"""Game boundaries found by iter_raw_games and PgnIndex."""
+
+import io
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import selector  # noqa: E402
+
+# The first game has a wrapped comment whose second line starts with "[".
+CLOCK_COMMENT_PGN = b'''[Event "Test"]
+[White "Alpha"]
+[Black "Beta"]
+[Result "1-0"]
+
+1. e4 { book
+[%clk 0:01:00] } e5 2. Nf3 {Black exited unexpectedly} 1-0
+
+[Event "Test"]
+[White "Beta"]
+[Black "Alpha"]
+[Result "1/2-1/2"]
+
+1. d4 d5 1/2-1/2
+'''
+
+
+def test_wrapped_comment_does_not_start_a_game():
+    games = list(selector.iter_raw_games(io.BytesIO(CLOCK_COMMENT_PGN)))
+    assert len(games) == 2
+    offset, end_offset, raw, flagged = games[0]
+    assert offset == 0
+    assert b'[%clk 0:01:00]' in raw
+    assert flagged
+    assert not games[1][3]
+    assert games[1][2].startswith(b'[Event "Test"]\n[White "Beta"]')
+
+
+def test_index_matches_scan(tmp_path):
+    path = tmp_path / 'games.pgn'
+    path.write_bytes(CLOCK_COMMENT_PGN)
+    index = selector.PgnIndex.build(str(path))
+    try:
+        games = list(selector.iter_raw_games(io.BytesIO(CLOCK_COMMENT_PGN)))
+        assert len(index) == 2
+        assert [index.game_range(n) for n in range(len(index))] == \
+            [(offset, end_offset) for offset, end_offset, _, _ in games]
+    finally:
+        index.close()